@@ -1,8 +1,24 @@
-from flask import Flask, render_template, request, jsonify
+import json
+import click
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context, url_for
+from flask.json.provider import DefaultJSONProvider
 from data_manager import data_manager
+from facet_index import FACETS
+from post_store import Post
+import metrics
+
+class BlogJSONProvider(DefaultJSONProvider):
+    """JSON 序列化：Post 记录输出为字典视图"""
+    @staticmethod
+    def default(o):
+        if isinstance(o, Post):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
 
 def create_app():
     app = Flask(__name__)
+    app.json = BlogJSONProvider(app)
+    metrics.init_app(app, data_manager)
     return app
 
 app = create_app()
@@ -22,15 +38,76 @@ def index():
 def search():
     """搜索页面"""
     query = request.args.get('q', '').strip()
-    page = request.args.get('page', 1, type=int)
-    per_page = 12
+    page, per_page = pagination_args(read_per_page=False)
+    filters = search_filters()
     
-    if query:
-        result = data_manager.search_posts(query, page=page, per_page=per_page)
+    if query or filters:
+        result = data_manager.search_posts(query, page=page, per_page=per_page, filters=filters)
     else:
-        result = data_manager.get_all_posts(page=page, per_page=per_page)
+        # 未输入关键词时按热度浏览全部文章，同样附带分面计数供筛选
+        result = data_manager.search_posts('', page=page, per_page=per_page, sort='popularity')
+    
+    return render_template('search.html', posts=result, query=query, filters=filters)
+
+def search_filters():
+    """从查询参数中读取分面筛选条件，例如 ?language=zh-cn&year=2024&keyword=读书"""
+    filters = {}
+    for facet in FACETS:
+        values = [value for value in request.args.getlist(facet) if value]
+        if values:
+            filters[facet] = values
+    return filters
+
+def pagination_args(read_per_page: bool = True):
+    """读取分页参数 page 和 per_page（默认 12，read_per_page 为 False 时固定），均不小于 1"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 12, type=int) if read_per_page else 12
+    return max(1, page), max(1, per_page)
+
+@app.template_global()
+def search_url(query, filters, facet=None, value=None, page=None):
+    """搜索页链接：切换某个分面取值的选中状态，保留其余条件"""
+    args = {name: list(values) for name, values in filters.items()}
+    if facet is not None:
+        values = args.setdefault(facet, [])
+        if value in values:
+            values.remove(value)
+        else:
+            values.append(value)
+    if page is not None:
+        args['page'] = page
+    return url_for('search', q=query, **args)
+
+@app.route('/api/search')
+def api_search():
+    """API: 分面搜索（q 为关键词，分面筛选参数同 /search，sort 为 id 或 popularity）"""
+    query = request.args.get('q', '').strip()
+    page, per_page = pagination_args()
+    sort = request.args.get('sort', 'id')
+    
+    try:
+        result = data_manager.search_posts(query, page=page, per_page=per_page,
+                                           filters=search_filters(), sort=sort)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'data': result
+    })
+
+@app.route('/api/suggest')
+def api_suggest():
+    """API: 搜索补全建议"""
+    query = request.args.get('q', '').strip()
+    limit = request.args.get('limit', 10, type=int)
+    
+    suggestions = data_manager.get_suggestions(query, limit=limit) if query else []
     
-    return render_template('search.html', posts=result, query=query)
+    return jsonify({
+        'success': True,
+        'data': suggestions
+    })
 
 @app.route('/post/<int:post_id>')
 def post_detail(post_id):
@@ -39,13 +116,13 @@ def post_detail(post_id):
     if not post:
         return "文章不存在", 404
     
+    data_manager.record_view(post_id)
     return render_template('post_detail.html', post=post)
 
 @app.route('/api/posts')
 def api_posts():
     """API: 获取文章列表（用于无限滚动）- 过滤纯英文，按热度排序"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 12, type=int)
+    page, per_page = pagination_args()
     
     result = data_manager.get_filtered_posts(filter_english=True, page=page, per_page=per_page)
     
@@ -54,6 +131,52 @@ def api_posts():
         'data': result
     })
 
+@app.route('/archive')
+@app.route('/archive/<int:year>')
+@app.route('/archive/<int:year>/<int:month>')
+def archive(year=None, month=None):
+    """归档页面 - 按年月浏览文章"""
+    if month is not None and not 1 <= month <= 12:
+        return "月份无效", 404
+    page, per_page = pagination_args(read_per_page=False)
+    
+    result = data_manager.get_posts_by_date(year, month, page=page, per_page=per_page)
+    date_groups = data_manager.get_date_groups()
+    
+    return render_template('archive.html', posts=result, date_groups=date_groups, year=year, month=month)
+
+@app.template_global()
+def archive_url(year=None, month=None, page=None, static_site=False):
+    """归档页链接；静态站点中第 2 页起使用路径形式 /archive/<年>/<月>/page/<n>（与 site_builder 一致）"""
+    if static_site:
+        path = url_for('archive', year=year, month=month)
+        return path if not page or page <= 1 else f"{path}/page/{page}"
+    return url_for('archive', year=year, month=month, page=page)
+
+@app.route('/api/archive')
+@app.route('/api/archive/<int:year>')
+@app.route('/api/archive/<int:year>/<int:month>')
+def api_archive(year=None, month=None):
+    """API: 按年月获取文章列表"""
+    if month is not None and not 1 <= month <= 12:
+        return jsonify({'success': False, 'error': '月份无效'}), 404
+    page, per_page = pagination_args()
+    
+    result = data_manager.get_posts_by_date(year, month, page=page, per_page=per_page)
+    
+    return jsonify({
+        'success': True,
+        'data': result
+    })
+
+@app.route('/api/archive/groups')
+def api_archive_groups():
+    """API: 获取按年月分组的文章统计"""
+    return jsonify({
+        'success': True,
+        'data': data_manager.get_date_groups()
+    })
+
 @app.route('/stats')
 def stats():
     """统计页面"""
@@ -88,6 +211,14 @@ def api_trend_stats():
         'data': trend_data
     })
 
+@app.route('/api/stats/cache')
+def api_cache_stats():
+    """API: 富化缓存命中率"""
+    return jsonify({
+        'success': True,
+        'data': data_manager.get_cache_stats()
+    })
+
 @app.route('/api/stats/content')
 def api_content_stats():
     """API: 获取内容分析统计"""
@@ -97,5 +228,67 @@ def api_content_stats():
         'data': content_data
     })
 
+@app.route('/api/export')
+def api_export():
+    """API: 以 NDJSON 流式导出文章
+    
+    参数 since（ISO 时间，按 created_at/updated_at 过滤）和 fields（逗号分隔的字段列表）
+    """
+    since = request.args.get('since', '').strip() or None
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    
+    posts = data_manager.iter_export(since=since, fields=fields or None)
+    try:
+        # 提前取第一条，使 since 格式错误时能返回 400
+        first = next(posts, None)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'since 格式无效'}), 400
+    
+    def generate():
+        if first is None:
+            return
+        yield json.dumps(first, ensure_ascii=False) + '\n'
+        for post in posts:
+            yield json.dumps(post, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus 指标"""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.cli.command('build')
+@click.option('--output', default='static_site', help='输出目录')
+@click.option('--workers', type=int, default=None, help='渲染进程数，默认为 CPU 核数')
+@click.option('--force', is_flag=True, help='忽略构建清单，全量重建')
+def build_command(output, workers, force):
+    """生成静态站点（只重新渲染内容有变化的页面）"""
+    from site_builder import build_site
+    result = build_site(data_manager, output, workers, force)
+    click.echo(f"共 {result['total']} 个页面，渲染 {result['rendered']} 个，"
+               f"跳过 {result['skipped']} 个，删除 {result['removed']} 个")
+
+@app.cli.command('export-posts')
+@click.option('--output', type=click.File('w', encoding='utf-8'), default='-', help='输出文件，默认标准输出')
+@click.option('--since', default=None, help='只导出该时间（ISO）之后创建或更新的文章')
+@click.option('--fields', default='', help='逗号分隔的字段列表，默认全部')
+def export_posts_command(output, since, fields):
+    """以 NDJSON 格式导出文章"""
+    fields = [field.strip() for field in fields.split(',') if field.strip()]
+    count = 0
+    for post in data_manager.iter_export(since=since, fields=fields or None):
+        output.write(json.dumps(post, ensure_ascii=False) + '\n')
+        count += 1
+    click.echo(f"导出 {count} 篇文章", err=True)
+
+@app.cli.command('import-posts')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+def import_posts_command(source):
+    """从 NDJSON 文件流式导入文章（按URL去重）"""
+    result = data_manager.import_ndjson(source)
+    click.echo(f"读取 {result['read']} 篇，新增 {result['added']} 篇，"
+               f"重复 {result['skipped']} 篇，解析失败 {result['errors']} 行")
+
 if __name__ == '__main__':
     app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""并发压力测试：多个读线程与写线程同时访问 BlogDataManager
+
+读线程不加锁地调用各查询接口并校验快照一致性（包括英文过滤和热度），写线程持续
+批量入库（发布前补全元数据）并保存。读请求不应等待写者：首页查询的 p99 超过 --max-home-p99 时视为失败
+（全文搜索本身需要扫描全部文章，总体延迟的长尾主要来自搜索）。任何不一致或异常都会使脚本以非零状态退出。
+
+用法: python benchmarks/bench_concurrency.py [--readers 8] [--seconds 10]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import generate_posts, percentile  # noqa: E402
+from data_manager import BlogDataManager  # noqa: E402
+
+
+def check_snapshot(manager):
+    """快照内文章 id 连续，且每篇文章元数据完整（写者在发布前补全）"""
+    snapshot = manager.snapshot()
+    posts = snapshot.posts
+    if posts and posts[-1]['id'] != len(posts):
+        raise AssertionError(f"id 不连续: {posts[-1]['id']} != {len(posts)}")
+    for post in posts[-50:]:
+        if 'language' not in post or 'keywords' not in post or 'popularity_score' not in post:
+            raise AssertionError(f"文章 {post['id']} 元数据不完整")
+    return len(posts)
+
+
+def reader(manager, stop, latencies, home_latencies, errors, seed):
+    rng = random.Random(seed)
+    last_total = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            total = check_snapshot(manager)
+            if total < last_total:
+                raise AssertionError(f"文章总数回退: {total} < {last_total}")
+            last_total = total
+
+            page = rng.randint(1, 20)
+            home_start = time.perf_counter()
+            result = manager.get_filtered_posts(filter_english=True, page=page, per_page=12)
+            home_latencies.append((time.perf_counter() - home_start) * 1000)
+            expected = max(0, min(12, result['total'] - (page - 1) * 12))
+            if len(result['posts']) != expected:
+                raise AssertionError(f"分页不一致: {len(result['posts'])} != {expected}")
+            for post in result['posts']:
+                # 读者不应拿到未处理的快照：过滤英文和热度排序都依赖元数据
+                if post.get('language') == 'en' or post.get('popularity_score') is None:
+                    raise AssertionError(f"文章 {post['id']} 未过滤英文或缺少热度: "
+                                         f"{post.get('language')!r}, {post.get('popularity_score')!r}")
+                if manager.get_post_by_id(post['id']) is None:
+                    raise AssertionError(f"文章 {post['id']} 查询不到")
+
+            action = rng.random()
+            if action < 0.3:
+                manager.search_posts(rng.choice(['程序员', 'python', '读书']), page=1)
+            elif action < 0.6:
+                result = manager.get_posts_by_date(rng.randint(2015, 2025), page=1)
+                if len(result['posts']) != min(12, result['total']):
+                    raise AssertionError("归档分页不一致")
+            elif action < 0.8:
+                manager.get_suggestions(rng.choice(['程', 'py', '读书', 'how']))
+            else:
+                manager.get_stats()
+        except Exception as e:
+            errors.append(repr(e))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def writer(manager, stop, batches, errors, batch_size):
+    offset = 0
+    while not stop.is_set() and offset < len(batches):
+        try:
+            manager.add_posts_batch(batches[offset:offset + batch_size])
+            offset += batch_size
+            manager.process_posts_metadata()
+            manager.save_data()
+        except Exception as e:
+            errors.append(repr(e))
+    return offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BlogDataManager 并发压力测试')
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--initial', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--max-home-p99', type=float, default=20,
+                        help='首页查询（get_filtered_posts）p99 延迟上限（毫秒），超过说明读者在等待写者')
+    args = parser.parse_args()
+
+    corpus = generate_posts(args.initial + 20000)
+    for post in corpus:
+        del post['id']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = BlogDataManager(data_file=os.path.join(tmp, 'blog_data.json'))
+        manager.add_posts_batch(corpus[:args.initial])
+
+        stop = threading.Event()
+        errors = []
+        latencies = []
+        home_latencies = []
+        threads = [
+            threading.Thread(target=reader, args=(manager, stop, latencies, home_latencies, errors, i))
+            for i in range(args.readers)
+        ]
+        threads.append(threading.Thread(
+            target=writer, args=(manager, stop, corpus[args.initial:], errors, args.batch_size)))
+
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        added = len(manager.posts) - args.initial
+        print(f"读线程 {args.readers} 个, 持续 {args.seconds:.0f} 秒, 写入新文章 {added} 篇")
+        print(f"读请求 {len(latencies)} 次 ({len(latencies) / args.seconds:.0f}/秒): "
+              f"p50 {percentile(latencies, 50):.2f}ms, p95 {percentile(latencies, 95):.2f}ms, "
+              f"p99 {percentile(latencies, 99):.2f}ms（含全文搜索）")
+        home_p99 = percentile(home_latencies, 99)
+        print(f"首页查询 {len(home_latencies)} 次: p50 {percentile(home_latencies, 50):.2f}ms, "
+              f"p95 {percentile(home_latencies, 95):.2f}ms, p99 {home_p99:.2f}ms")
+        if home_p99 > args.max_home_p99:
+            errors.append(f"首页查询 p99 {home_p99:.2f}ms 超过 {args.max_home_p99}ms")
+
+        reloaded = BlogDataManager(data_file=manager.data_file)
+        if len(reloaded.posts) > len(manager.posts):
+            errors.append("保存的文件比内存中的数据更多")
+
+        if errors:
+            print(f"发现 {len(errors)} 个错误，例如: {errors[:3]}")
+            sys.exit(1)
+        print("未发现不一致")
+
+
+if __name__ == '__main__':
+    main()
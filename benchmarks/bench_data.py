@@ -0,0 +1,230 @@
+"""数据层微基准：BlogDataManager 与爬虫解析热点函数的规模曲线
+
+对每个函数在递增规模 N 上测量耗时（多次取最小值）和峰值内存（tracemalloc），
+并用首尾两点估算 log-log 斜率。斜率超过 --max-exponent（默认 1.3）视为
+超线性增长（例如批量入库时逐条 post_exists 全表扫描导致的 O(n²)），
+此时脚本以非零状态退出，便于在 CI 中守住线性复杂度。
+
+用法: python benchmarks/bench_data.py [--sizes 250 500 1000 2000 4000] [--only search_posts]
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(ROOT, 'benchmarks', 'fixtures', 'blogspot_listing.html')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_posts  # noqa: E402
+
+# 在临时目录中导入，避免爬虫日志、缓存和全局数据管理器读写仓库内的文件
+WORKDIR = tempfile.mkdtemp(prefix='moyun-bench-')
+os.chdir(WORKDIR)
+os.environ['BLOG_DATA_FILE'] = os.path.join(WORKDIR, 'global_blog_data.json')
+# 关闭富化缓存，使冷启动用例测量的是真实的语言检测和分词耗时（缓存效果见 bench_enrichment.py）
+os.environ['ENRICHMENT_CACHE'] = 'off'
+
+from data_manager import BlogDataManager  # noqa: E402
+from crawler import FastBlogCrawler, logger as crawler_logger  # noqa: E402
+
+crawler_logger.disabled = True
+
+DATE_SAMPLES = ['2024-12-01', '2024/7/9', '2023年5月20日', '12/31/2022', '1-2-2021', '发布于 2025-08-09 09:11', '']
+
+
+class Corpus:
+    """按规模缓存合成语料和已写入磁盘的数据文件"""
+
+    def __init__(self):
+        self._posts = {}
+        self._files = {}
+
+    def posts(self, size: int):
+        if size not in self._posts:
+            self._posts[size] = generate_posts(size, seed=size)
+        return self._posts[size]
+
+    def data_file(self, size: int, processed: bool = True) -> str:
+        """数据文件；processed 为 True 时文章已带语言、关键词和热度（与 save_data 的结果一致）"""
+        key = (size, processed)
+        if key not in self._files:
+            path = os.path.join(WORKDIR, f'corpus_{size}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'posts': self.posts(size)}, f, ensure_ascii=False)
+            if processed:
+                # 加载时补全元数据，保存后即为已处理的数据文件
+                manager = BlogDataManager(path)
+                manager.data_file = path = os.path.join(WORKDIR, f'processed_{size}.json')
+                manager.save_data()
+            self._files[key] = path
+        return self._files[key]
+
+    def manager(self, size: int) -> BlogDataManager:
+        manager = BlogDataManager(self.data_file(size))
+        manager.data_file = os.path.join(WORKDIR, f'save_{size}.json')
+        return manager
+
+
+corpus = Corpus()
+_processed = {}
+
+
+def processed_manager(size: int) -> BlogDataManager:
+    """已加载的管理器（按规模复用）"""
+    if size not in _processed:
+        _processed[size] = corpus.manager(size)
+    return _processed[size]
+
+
+def rescore_manager(size: int) -> BlogDataManager:
+    manager = processed_manager(size)
+    manager.snapshot().scored_on = date.today() - timedelta(days=1)  # 模拟跨天后重新计算热度
+    return manager
+
+
+def new_batch(size: int):
+    """size 篇新文章 + size/2 篇重复文章"""
+    fresh = generate_posts(size, seed=size + 1)
+    for i, post in enumerate(fresh):
+        post['url'] = f"https://example.blogspot.com/new/{size}/{i}.html"
+        del post['id']
+    return fresh + [dict(post) for post in corpus.posts(size)[:size // 2]]
+
+
+def ndjson_lines(size: int):
+    """new_batch(size) 的 NDJSON 行（含重复文章）"""
+    return [json.dumps(post, ensure_ascii=False) for post in new_batch(size)]
+
+
+def listing_html(size: int) -> str:
+    """将固定的列表页文章块复制到 size 篇，模拟大列表页"""
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        page = f.read()
+    head, rest = page.split('<div class="blog-posts hfeed">', 1)
+    blocks, tail = rest.split('<div class="blog-pager"', 1)
+    block_list = blocks.strip().rsplit('\n</div>', 1)[0].split('<div class="date-outer">')[1:]
+    repeated = []
+    for i in range(size):
+        block = block_list[i % len(block_list)]
+        repeated.append('<div class="date-outer">' + block.replace('.html"', f'?copy={i}.html"'))
+    return head + '<div class="blog-posts hfeed">\n' + '\n'.join(repeated) + '\n</div>\n<div class="blog-pager"' + tail
+
+
+def new_crawler() -> FastBlogCrawler:
+    return FastBlogCrawler('https://hwv430.blogspot.com', max_workers=1)
+
+
+CASES = {
+    'load_data': (lambda n: corpus.data_file(n), lambda path: BlogDataManager(path)),
+    'load_data(cold)': (lambda n: corpus.data_file(n, processed=False), lambda path: BlogDataManager(path)),
+    'save_data': (lambda n: processed_manager(n), lambda manager: manager.save_data()),
+    'add_posts_batch': (lambda n: (corpus.manager(n), new_batch(n)),
+                        lambda state: state[0].add_posts_batch(state[1])),
+    'import_ndjson': (lambda n: (corpus.manager(n), ndjson_lines(n)),
+                      lambda state: state[0].import_ndjson(state[1])),
+    'process_posts_metadata(warm)': (lambda n: processed_manager(n), lambda manager: manager.process_posts_metadata()),
+    'process_posts_metadata(rescore)': (rescore_manager, lambda manager: manager.process_posts_metadata()),
+    'search_posts': (lambda n: processed_manager(n), lambda manager: manager.search_posts('程序员', page=2)),
+    'search_posts(facets)': (lambda n: processed_manager(n),
+                             lambda manager: manager.search_posts(
+                                 filters={'language': ['zh-cn'], 'length': ['medium', 'long']}, page=2)),
+    'get_filtered_posts': (lambda n: processed_manager(n),
+                           lambda manager: manager.get_filtered_posts(filter_english=True, page=max(1, len(manager.posts) // 24))),
+    'get_stats': (lambda n: processed_manager(n), lambda manager: manager.get_stats()),
+    'get_language_distribution': (lambda n: processed_manager(n), lambda manager: manager.get_language_distribution()),
+    'get_monthly_trend': (lambda n: processed_manager(n), lambda manager: manager.get_monthly_trend(12)),
+    'get_content_analysis': (lambda n: processed_manager(n), lambda manager: manager.get_content_analysis()),
+    'parse_blog_posts': (lambda n: (new_crawler(), listing_html(n)),
+                         lambda state: state[0].parse_blog_posts(state[1], 'https://hwv430.blogspot.com/')),
+    'extract_date': (lambda n: (new_crawler(), [DATE_SAMPLES[i % len(DATE_SAMPLES)] for i in range(n)]),
+                     lambda state: [state[0].extract_date(text) for text in state[1]]),
+    'generate_summary': (lambda n: (new_crawler(), [post['content'] for post in corpus.posts(n)]),
+                         lambda state: [state[0].generate_summary(content) for content in state[1]]),
+}
+
+# 新文章在入库时做语言检测和分词（每篇约 1ms），这些用例默认在较小的规模上运行
+SLOW_CASES = {'load_data(cold)', 'add_posts_batch', 'import_ndjson'}
+
+
+def measure(setup, run, size: int, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        state = setup(size)
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+
+    state = setup(size)
+    gc.collect()
+    tracemalloc.start()
+    run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def exponent(points):
+    """首尾两点的 log-log 斜率"""
+    (n0, t0), (n1, t1) = points[0], points[-1]
+    if n0 == n1 or t0 <= 0 or t1 <= 0:
+        return 0.0
+    return math.log(t1 / t0) / math.log(n1 / n0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据层微基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 500, 1000, 2000, 4000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help='只运行指定的用例')
+    parser.add_argument('--max-exponent', type=float, default=1.3)
+    parser.add_argument('--min-time', type=float, default=0.001,
+                        help='最大规模耗时低于该值（秒）的用例不做斜率检查，避免计时噪声')
+    parser.add_argument('--json', help='将结果写入 JSON 文件')
+    args = parser.parse_args()
+
+    random.seed(0)
+    results = {}
+    failures = []
+    for name, (setup, run) in CASES.items():
+        if args.only and name not in args.only:
+            continue
+        sizes = args.sizes[:3] if name in SLOW_CASES else args.sizes
+        print(f"\n{name}")
+        print(f"{'N':>8}{'耗时(ms)':>12}{'每条(µs)':>12}{'峰值内存(KB)':>14}")
+        points = []
+        rows = []
+        for size in sizes:
+            seconds, peak = measure(setup, run, size, 1 if name in SLOW_CASES else args.repeat)
+            points.append((size, seconds))
+            rows.append({'n': size, 'seconds': seconds, 'peak_bytes': peak})
+            print(f"{size:>8}{seconds * 1000:>12.3f}{seconds / size * 1e6:>12.2f}{peak / 1024:>14.1f}")
+        slope = exponent(points)
+        checked = points[-1][1] >= args.min_time
+        verdict = '' if not checked else ('  <-- 超线性!' if slope > args.max_exponent else '')
+        print(f"  斜率 {slope:.2f}{verdict}")
+        if checked and slope > args.max_exponent:
+            failures.append(f"{name}: 斜率 {slope:.2f}")
+        results[name] = {'exponent': round(slope, 3), 'points': rows}
+
+    if args.json:
+        with open(os.path.join(ROOT, args.json) if not os.path.isabs(args.json) else args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if failures:
+        print(f"\n发现超线性增长（阈值 {args.max_exponent}）: {failures}")
+        sys.exit(1)
+    print("\n所有用例的增长均不超过阈值")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""分布式爬取测试：本地桩服务器 + 多个 worker 进程
+
+桩服务器生成博客列表页（每页 posts_per_page 篇文章），首页像归档侧栏一样链接到所有列表页，
+其余页链接到前后页；每次响应前等待 latency 秒模拟网络延迟。
+
+1. 扩展性：分别用 1/2/4 个 worker 爬完整个站点，输出吞吐量（页/秒）
+2. 崩溃恢复：爬取中途 kill -9 一个持有租约的 worker，校验其租约被回收、没有文章丢失
+
+任何文章缺失或重复都会使脚本以非零状态退出。
+
+用法: python benchmarks/bench_distributed.py [--pages 255] [--latency 0.05] [--workers 1 2 4]
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def listing_page(page: int, pages: int, posts_per_page: int) -> str:
+    """第 page 页：文章列表 + 分页链接（首页链接所有页，其余页链接前后页）"""
+    posts = []
+    for j in range(posts_per_page):
+        number = page * posts_per_page + j
+        posts.append(
+            f'<div class="post"><h3 class="post-title"><a href="/2024/01/post-{number}.html">文章 {number}</a></h3>'
+            f'<abbr class="published">2024-01-{number % 28 + 1:02d}</abbr>'
+            f'<div class="post-body">第 {number} 篇测试文章的正文内容。</div></div>')
+    targets = range(1, pages) if page == 0 else (page - 1, page + 1)
+    links = [f'<a href="/search?start-index={target}">第 {target} 页</a>'
+             for target in targets if 0 < target < pages]
+    return (f'<html><body>{"".join(posts)}<div class="blog-pager">{"".join(links)}</div>'
+            f'</body></html>')
+
+
+def start_stub_server(pages: int, posts_per_page: int, latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            page = int(query.get('start-index', ['0'])[0])
+            time.sleep(latency)
+            body = listing_page(page, pages, posts_per_page).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            # 被 kill 的 worker 会留下断开的连接，忽略
+            pass
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def worker_command(db_path: str, base_url: str, threads: int, visibility_timeout: float):
+    return [sys.executable, os.path.join(ROOT, 'distributed_crawler.py'), 'worker',
+            '--db', db_path, '--base-url', base_url, '--threads', str(threads), '--batch-size', str(threads),
+            '--visibility-timeout', str(visibility_timeout), '--idle-timeout', '1', '--no-delay']
+
+
+def check_posts(manager, expected: int) -> bool:
+    urls = [post['url'] for post in manager.posts]
+    if len(urls) != expected or len(set(urls)) != len(urls):
+        print(f"  失败: 期望 {expected} 篇文章，实际 {len(urls)} 篇（去重后 {len(set(urls))} 篇）")
+        return False
+    return True
+
+
+def run_scaling(workdir, base_url, pages, posts_per_page, worker_counts, threads):
+    from data_manager import BlogDataManager
+    from distributed_crawler import CrawlQueue, run_coordinator
+
+    ok = True
+    baseline = None
+    print(f"{'workers':>8} {'墙钟(s)':>10} {'抓取(s)':>10} {'页/秒':>10} {'加速比':>8}")
+    for workers in worker_counts:
+        run_dir = tempfile.mkdtemp(dir=workdir)
+        db_path = os.path.join(run_dir, 'queue.db')
+        manager = BlogDataManager(os.path.join(run_dir, 'blog_data.json'))
+        start = time.perf_counter()
+        run_coordinator(db_path, base_url, workers, merge_interval=0.5, manager=manager,
+                        worker_args=['--threads', str(threads), '--batch-size', str(threads),
+                                     '--idle-timeout', '1', '--no-delay'])
+        wall = time.perf_counter() - start
+
+        queue = CrawlQueue(db_path)
+        first, last = queue.conn.execute('SELECT MIN(created_at), MAX(created_at) FROM results').fetchone()
+        done = queue.stats()['done']
+        queue.close()
+        # 抓取时间从第一条结果算起，排除进程启动开销
+        crawl = max(last - first, 1e-9)
+        rate = done / crawl
+        baseline = baseline or rate
+        print(f"{workers:>8} {wall:>10.2f} {crawl:>10.2f} {rate:>10.1f} {rate / baseline:>7.2f}x")
+        ok = check_posts(manager, pages * posts_per_page) and ok
+    return ok
+
+
+def run_crash_recovery(workdir, base_url, pages, posts_per_page, threads):
+    from data_manager import BlogDataManager
+    from crawler import FastBlogCrawler
+    from distributed_crawler import CrawlQueue, merge_results
+
+    run_dir = tempfile.mkdtemp(dir=workdir)
+    db_path = os.path.join(run_dir, 'queue.db')
+    manager = BlogDataManager(os.path.join(run_dir, 'blog_data.json'))
+    queue = CrawlQueue(db_path)
+    queue.enqueue(FastBlogCrawler.seed_urls(base_url))
+
+    visibility_timeout = 3
+    victim = subprocess.Popen(worker_command(db_path, base_url, threads, visibility_timeout))
+    survivor = subprocess.Popen(worker_command(db_path, base_url, threads, visibility_timeout))
+    ok = True
+    try:
+        # 等 victim 持有租约后强制杀死
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            held = queue.conn.execute(
+                "SELECT COUNT(*) FROM urls WHERE state = 'leased' AND lease_owner LIKE ?",
+                (f'%-{victim.pid}-%',)).fetchone()[0]
+            if held:
+                break
+            time.sleep(0.01)
+        victim.send_signal(signal.SIGKILL)
+        victim.wait()
+        print(f"  已 kill -9 worker（pid {victim.pid}），其持有租约 {held} 个")
+        survivor.wait(timeout=300)
+    finally:
+        for process in (victim, survivor):
+            if process.poll() is None:
+                process.kill()
+
+    merge_results(queue, manager)
+    stats = queue.stats()
+    reclaimed = queue.conn.execute('SELECT COUNT(*) FROM urls WHERE attempts > 1').fetchone()[0]
+    queue.close()
+    print(f"  队列状态: {stats}，被回收重新领取的URL: {reclaimed} 个")
+    if not held or reclaimed < held:
+        print("  失败: 崩溃 worker 的租约未被回收")
+        ok = False
+    if stats['pending'] or stats['leased'] or stats['failed']:
+        print("  失败: 队列未清空")
+        ok = False
+    return check_posts(manager, pages * posts_per_page) and ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=255)
+    parser.add_argument('--posts-per-page', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.05, help='桩服务器响应延迟（秒）')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=2, help='每个 worker 的抓取线程数')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_distributed_')
+    # worker 子进程继承工作目录和数据文件，爬虫日志与缓存都写在临时目录
+    os.chdir(workdir)
+    os.environ['BLOG_DATA_FILE'] = os.path.join(workdir, 'blog_data.json')
+
+    server = start_stub_server(args.pages, args.posts_per_page, args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"桩服务器 {base_url}：{args.pages} 页 × {args.posts_per_page} 篇，延迟 {args.latency * 1000:.0f}ms")
+
+    print("\n== 扩展性 ==")
+    ok = run_scaling(workdir, base_url, args.pages, args.posts_per_page, args.workers, args.threads)
+    print("\n== 崩溃恢复 ==")
+    ok = run_crash_recovery(workdir, base_url, args.pages, args.posts_per_page, args.threads) and ok
+    server.shutdown()
+
+    print("\n通过" if ok else "\n失败")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
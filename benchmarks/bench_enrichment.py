@@ -0,0 +1,88 @@
+"""富化缓存基准：语言检测与关键词提取在冷缓存、热缓存下的耗时
+
+加载数据时在发布前补全元数据，因此以加载未处理的数据文件的耗时衡量富化开销。
+1. 冷启动：空的 SQLite 缓存上加载 N 篇未处理的文章（全部未命中并写入缓存）
+2. 重建：新的数据管理器读取同一数据文件，共享同一缓存文件再次加载（应全部命中）
+3. 容量：把缓存上限设为小于全部结果，校验淘汰后缓存大小不超过上限
+
+热缓存结果与冷启动不一致、命中率低于 --min-hit-rate 或超出容量上限时以非零状态退出。
+
+用法: python benchmarks/bench_enrichment.py [--sizes 500 2000] [--min-hit-rate 0.99]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import generate_posts  # noqa: E402
+from data_manager import BlogDataManager  # noqa: E402
+from enrichment_cache import SQLiteEnrichmentCache  # noqa: E402
+
+
+def metadata(manager):
+    return [(post.get('language'), post.get('keywords')) for post in manager.posts]
+
+
+def run(size: int, workdir: str, min_hit_rate: float) -> bool:
+    data_file = os.path.join(workdir, f'corpus_{size}.json')
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump({'posts': generate_posts(size, seed=size)}, f, ensure_ascii=False)
+    cache_file = os.path.join(workdir, f'cache_{size}.db')
+
+    timings = {}
+    results = {}
+    stats = {}
+    for phase in ('冷启动', '重建'):
+        cache = SQLiteEnrichmentCache(cache_file)
+        start = time.perf_counter()
+        manager = BlogDataManager(data_file, enrichment_cache=cache)
+        timings[phase] = time.perf_counter() - start
+        results[phase] = metadata(manager)
+        stats[phase] = cache.stats()
+        cache.close()
+
+    warm = stats['重建']
+    print(f"{size:>8} {timings['冷启动'] * 1000:>12.1f} {timings['重建'] * 1000:>12.1f} "
+          f"{timings['冷启动'] / timings['重建']:>8.1f}x {warm['hit_rate']:>8.2%} {warm['bytes'] / 1024:>10.1f}")
+
+    ok = True
+    if results['冷启动'] != results['重建']:
+        print("  失败: 命中缓存后的元数据与冷启动不一致")
+        ok = False
+    if warm['hit_rate'] < min_hit_rate:
+        print(f"  失败: 命中率 {warm['hit_rate']:.2%} 低于 {min_hit_rate:.2%}")
+        ok = False
+
+    # 上限设为全部结果的一半，校验淘汰
+    max_bytes = warm['bytes'] // 2
+    cache = SQLiteEnrichmentCache(os.path.join(workdir, f'small_{size}.db'), max_bytes=max_bytes, batch_size=100)
+    BlogDataManager(data_file, enrichment_cache=cache)
+    small = cache.stats()
+    cache.close()
+    if small['bytes'] > max_bytes or not small['evictions']:
+        print(f"  失败: 容量上限 {max_bytes} 字节，实际 {small['bytes']} 字节，淘汰 {small['evictions']} 条")
+        ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--min-hit-rate', type=float, default=0.99)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_enrichment_')
+    print(f"{'文章数':>8} {'冷启动(ms)':>12} {'重建(ms)':>12} {'加速':>9} {'命中率':>8} {'缓存(KB)':>10}")
+    ok = True
+    for size in args.sizes:
+        ok = run(size, workdir, args.min_hit_rate) and ok
+    print("\n通过" if ok else "\n失败")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""文章存储内存与聚合耗时对比：list-of-dicts vs Post 记录 + 列式视图
+
+用法: python benchmarks/bench_memory.py [--sizes 10000 100000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import generate_posts  # noqa: E402
+from post_store import Post, PostColumns  # noqa: E402
+
+
+def _enrich(post: dict, i: int):
+    post['language'] = 'en' if i % 10 == 0 else 'zh-cn'
+    post['keywords'] = ['程序员', '赚钱', '开源', '工具', '技术'][:i % 6]
+    post['popularity_score'] = float(i % 17)
+
+
+def load_as_dicts(raw_posts):
+    """旧表示：与原 load_data 相同，publish_date 转为 date 对象"""
+    posts = []
+    for i, data in enumerate(raw_posts):
+        post = dict(data)
+        if post.get('publish_date'):
+            post['publish_date'] = datetime.fromisoformat(post['publish_date']).date()
+        _enrich(post, i)
+        posts.append(post)
+    return posts
+
+
+def load_as_records(raw_posts):
+    posts = []
+    for i, data in enumerate(raw_posts):
+        post = Post.from_dict(data)
+        _enrich(post, i)
+        posts.append(post)
+    return posts
+
+
+def measure(factory):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = factory()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def dict_aggregate(posts):
+    """旧实现中的逐条聚合与排序"""
+    language_count = defaultdict(int)
+    total_title = total_content = 0
+    for post in posts:
+        language_count[post.get('language', 'unknown')] += 1
+        total_title += len(post.get('title', ''))
+        total_content += len(post.get('content', ''))
+    filtered = [post for post in posts if post.get('language', 'unknown') != 'en']
+    ranked = sorted(filtered, key=lambda x: x.get('popularity_score', 0), reverse=True)
+    return dict(language_count), total_title, total_content, ranked[:12]
+
+
+def column_aggregate(columns):
+    ranked = columns.ranking(exclude_language='en')
+    return (columns.language_distribution(), sum(columns.title_lengths), sum(columns.content_lengths),
+            [columns.posts[i] for i in ranked[:12]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文章存储内存基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'N':>8} {'dicts(MB)':>10} {'records(MB)':>12} {'columns(MB)':>12} {'节省':>6} "
+          f"{'dict聚合(ms)':>12} {'列聚合(ms)':>10} {'列聚合·缓存(ms)':>14}")
+    for size in args.sizes:
+        raw_posts = generate_posts(size)
+        dicts, dict_bytes = measure(lambda: load_as_dicts(raw_posts))
+        records, record_bytes = measure(lambda: load_as_records(raw_posts))
+        columns, column_bytes = measure(lambda: PostColumns(records))
+
+        start = time.perf_counter()
+        expected = dict_aggregate(dicts)
+        dict_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        actual = column_aggregate(columns)
+        column_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        column_aggregate(columns)
+        cached_ms = (time.perf_counter() - start) * 1000
+
+        assert expected[:3] == actual[:3]
+        assert [post['id'] for post in expected[3]] == [post['id'] for post in actual[3]]
+
+        saved = 1 - (record_bytes + column_bytes) / dict_bytes
+        print(f"{size:>8} {dict_bytes / 2**20:>10.1f} {record_bytes / 2**20:>12.1f} {column_bytes / 2**20:>12.1f} "
+              f"{saved:>6.0%} {dict_ms:>12.1f} {column_ms:>10.1f} {cached_ms:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
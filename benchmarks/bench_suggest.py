@@ -0,0 +1,75 @@
+"""搜索补全索引延迟基准
+
+用法: python benchmarks/bench_suggest.py [--titles 100000] [--queries 20000]
+"""
+import argparse
+import heapq
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import EN_TITLE_WORDS, ZH_TITLE_WORDS, percentile  # noqa: E402
+from suggest_index import SuggestIndex, normalize_term  # noqa: E402
+
+
+def synthetic_titles(count: int, seed: int = 42):
+    """生成中英混合的合成标题"""
+    rng = random.Random(seed)
+    for i in range(count):
+        words = ZH_TITLE_WORDS if rng.random() < 0.7 else EN_TITLE_WORDS
+        sep = '' if words is ZH_TITLE_WORDS else ' '
+        title = sep.join(rng.choice(words) for _ in range(rng.randint(2, 5)))
+        yield f"{title} {i}" if rng.random() < 0.3 else title, rng.uniform(0, 15)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='搜索补全索引延迟基准')
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=20000)
+    args = parser.parse_args()
+
+    titles = list(synthetic_titles(args.titles))
+    entries = [(title, 'title', i, weight) for i, (title, weight) in enumerate(titles)]
+
+    index = SuggestIndex()
+    start = time.perf_counter()
+    index.build(entries)
+    print(f"构建索引: {len(index)} 个词条, 耗时 {time.perf_counter() - start:.2f} 秒, "
+          f"预计算前缀 {len(index._top)} 个")
+
+    rng = random.Random(7)
+    prefixes = []
+    for _ in range(args.queries):
+        term = normalize_term(rng.choice(titles)[0])
+        prefixes.append(term[:rng.randint(1, min(6, len(term)))])
+
+    latencies = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        index.suggest(prefix, 10)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    print(f"查询 {len(prefixes)} 次: p50 {percentile(latencies, 50):.1f}µs, "
+          f"p95 {percentile(latencies, 95):.1f}µs, p99 {percentile(latencies, 99):.1f}µs, "
+          f"max {max(latencies):.1f}µs, 平均 {statistics.mean(latencies):.1f}µs")
+
+    # 模拟爬虫批量入库后的增量更新
+    batch = [(f"新文章{rng.choice(ZH_TITLE_WORDS)}{i}", 'title', args.titles + i, rng.uniform(0, 15)) for i in range(50)]
+    start = time.perf_counter()
+    index.add(batch)
+    print(f"增量加入 {len(batch)} 个词条: {(time.perf_counter() - start) * 1000:.2f} 毫秒")
+
+    # 与暴力扫描对照校验
+    for prefix in prefixes[:200]:
+        expected = heapq.nlargest(10, (item for item in index.items if item.term.startswith(prefix)),
+                                  key=lambda item: item.weight)
+        actual = index.suggest(prefix, 10)
+        assert [round(item.weight, 2) for item in expected] == [item["score"] for item in actual], prefix
+    print("结果校验通过")
+
+
+if __name__ == '__main__':
+    main()
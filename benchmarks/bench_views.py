@@ -0,0 +1,161 @@
+"""浏览计数压测
+
+1. 计数路径：多个线程并发调用 ViewCounter.record()，后台线程同时高频汇总，
+   输出每秒计数次数，并与单个全局锁保护的 Counter 对比；汇总后校验计数无丢失
+2. 每请求一个线程：按 Werkzeug 线程模式为每次计数新建线程（最多 --threads 个同时存活），
+   与不计数的空请求对比得出每次计数的额外开销，并校验计数无丢失
+3. 排名合并：在不同规模语料上测量浏览加分并入热度排名（boosted_ranking）的耗时
+
+计数丢失或吞吐量低于 --min-rate 时以非零状态退出。
+
+用法: python benchmarks/bench_views.py [--threads 1 4 8] [--hits 200000] [--requests 20000] [--min-rate 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import generate_posts  # noqa: E402
+from post_store import Post, PostColumns  # noqa: E402
+from view_counter import ViewCounter  # noqa: E402
+
+
+class LockedCounter:
+    """对照组：每次计数都获取全局锁"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, post_id):
+        with self.lock:
+            self.counts[post_id] += 1
+
+
+def hammer(counter, threads: int, hits: int, post_ids):
+    """threads 个线程各计数 hits 次，返回 (总次数, 耗时)"""
+    barrier = threading.Barrier(threads + 1)
+
+    def run(seed):
+        ids = random.Random(seed).choices(post_ids, k=hits)
+        record = counter.record
+        barrier.wait()
+        for post_id in ids:
+            record(post_id)
+
+    workers = [threading.Thread(target=run, args=(seed,)) for seed in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * hits, time.perf_counter() - start
+
+
+def bench_record(thread_counts, hits: int, min_rate: float) -> bool:
+    post_ids = list(range(1, 5001))
+    ok = True
+    print(f"{'线程':>6} {'ViewCounter 次/秒':>20} {'全局锁 次/秒':>16} {'纳秒/次':>10}")
+    for threads in thread_counts:
+        # 汇总间隔很短，让汇总与计数充分并发
+        counter = ViewCounter(flush_interval=0.01)
+        total, elapsed = hammer(counter, threads, hits, post_ids)
+        counter.stop()
+        locked_total, locked_elapsed = hammer(LockedCounter(), threads, hits, post_ids)
+
+        rate = total / elapsed
+        print(f"{threads:>6} {rate:>20,.0f} {locked_total / locked_elapsed:>16,.0f} {elapsed / total * 1e9:>10.0f}")
+        # 分数在计数期间已有极小的衰减，只做近似比较
+        counted = sum(counter.scores().values())
+        if counter.total_views != total or abs(counted - total) > total * 1e-4:
+            print(f"  失败: 计数 {counter.total_views}（分数合计 {counted:.0f}），期望 {total}")
+            ok = False
+        if rate < min_rate:
+            print(f"  失败: 吞吐量低于 {min_rate:,.0f} 次/秒")
+            ok = False
+    return ok
+
+
+def per_request(record, requests: int, concurrency: int, post_ids) -> float:
+    """每次计数新建一个线程，最多 concurrency 个同时存活，返回耗时"""
+    ids = random.Random(0).choices(post_ids, k=requests)
+    alive = []
+    start = time.perf_counter()
+    for post_id in ids:
+        if len(alive) >= concurrency:
+            alive.pop(0).join()
+        thread = threading.Thread(target=record, args=(post_id,))
+        thread.start()
+        alive.append(thread)
+    for thread in alive:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def bench_per_request(thread_counts, requests: int) -> bool:
+    post_ids = list(range(1, 5001))
+    ok = True
+    print(f"\n{'并发线程':>8} {'空请求 次/秒':>14} {'计数 次/秒':>12} {'计数开销(µs/次)':>16}")
+    for concurrency in thread_counts:
+        baseline = per_request(lambda post_id: None, requests, concurrency, post_ids)
+        counter = ViewCounter(flush_interval=0.01)
+        elapsed = per_request(counter.record, requests, concurrency, post_ids)
+        counter.stop()
+        overhead = max(0.0, elapsed - baseline) / requests * 1e6
+        print(f"{concurrency:>8} {requests / baseline:>14,.0f} {requests / elapsed:>12,.0f} {overhead:>16.2f}")
+        if counter.total_views != requests:
+            print(f"  失败: 计数 {counter.total_views}，期望 {requests}")
+            ok = False
+    return ok
+
+
+def bench_ranking(sizes, viewed: int):
+    print(f"\n{'文章数':>8} {'浏览过的文章':>12} {'基础排名(ms)':>14} {'叠加浏览(ms)':>14}")
+    for size in sizes:
+        posts = [Post.from_dict(data) for data in generate_posts(size, seed=size)]
+        rng = random.Random(size)
+        for i, post in enumerate(posts):
+            post['id'] = i + 1
+            post['popularity_score'] = float(rng.randint(0, 12))
+        columns = PostColumns(posts)
+
+        start = time.perf_counter()
+        order = columns.ranking()
+        base_ms = (time.perf_counter() - start) * 1000
+
+        counter = ViewCounter(flush_interval=0)
+        for post_id in rng.choices(range(1, size + 1), k=viewed * 5):
+            counter.record(post_id)
+        counter.flush()
+        _, bonuses = counter.boosts()
+        start = time.perf_counter()
+        columns.boosted_ranking(order, bonuses)
+        boosted_ms = (time.perf_counter() - start) * 1000
+        print(f"{size:>8} {len(bonuses):>12} {base_ms:>14.1f} {boosted_ms:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--hits', type=int, default=200000, help='每个线程的计数次数')
+    parser.add_argument('--requests', type=int, default=20000, help='每请求一个线程测试中的请求数')
+    parser.add_argument('--min-rate', type=float, default=100000, help='最低吞吐量（次/秒）')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--viewed', type=int, default=1000, help='排名测试中被浏览的文章数量级')
+    args = parser.parse_args()
+
+    ok = bench_record(args.threads, args.hits, args.min_rate)
+    ok = bench_per_request(args.threads, args.requests) and ok
+    bench_ranking(args.sizes, args.viewed)
+    print("\n通过" if ok else "\n失败")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""Web 压测：在本地 WSGI 服务器上对主要路由做并发压测
+
+为每个语料规模生成合成 blog_data.json，在子进程中启动 app.py，
+并发请求 /、/api/posts 深分页、/search、/post/<id> 和 /stats，
+输出各路由吞吐量与 p50/p95/p99 延迟。
+
+用法:
+    python benchmarks/bench_web.py --sizes 1000 10000 100000 --concurrency 8
+    python benchmarks/bench_web.py --save-baseline benchmarks/results/web_baseline.json
+    python benchmarks/bench_web.py --baseline benchmarks/results/web_baseline.json --tolerance 0.2
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus import generate_posts, percentile  # noqa: E402
+
+SEARCH_TERMS = ['程序员', '读书', 'python', '开源', '不存在的关键词']
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(data_file: str, port: int):
+    """子进程入口：加载指定数据文件并启动多线程 WSGI 服务器"""
+    os.environ['BLOG_DATA_FILE'] = data_file
+    os.chdir(ROOT)
+    from werkzeug.serving import make_server
+    from app import app
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def start_server(data_file: str, port: int, timeout: float = 600) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', data_file, '--port', str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            # 首个请求会触发元数据处理，作为预热
+            fetch(port, '/', timeout=timeout)
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError('服务器启动失败')
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('服务器启动超时')
+
+
+def fetch(port: int, path: str, timeout: float = 60) -> int:
+    """请求一次，返回响应体字节数"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        body = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{path} 返回 {response.status}")
+        return len(body)
+    finally:
+        connection.close()
+
+
+def route_paths(route: str, size: int, count: int, rng: random.Random):
+    pages = max(1, size // 12)
+    for _ in range(count):
+        if route == '/':
+            yield '/'
+        elif route == '/api/posts':
+            # 深分页：集中在后半部分
+            yield f"/api/posts?page={rng.randint(pages // 2 + 1, pages)}&per_page=12"
+        elif route == '/search':
+            yield f"/search?q={quote(rng.choice(SEARCH_TERMS))}&page={rng.randint(1, 3)}"
+        elif route == '/post/<id>':
+            yield f"/post/{rng.randint(1, size)}"
+        elif route == '/stats':
+            yield '/stats'
+
+
+ROUTES = ('/', '/api/posts', '/search', '/post/<id>', '/stats')
+
+
+def run_route(port: int, paths, concurrency: int):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(path):
+        start = time.perf_counter()
+        try:
+            fetch(port, path)
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, paths))
+    wall = time.perf_counter() - start
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput': round(len(latencies) / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+    }
+
+
+def benchmark_size(size: int, args) -> dict:
+    rng = random.Random(size)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'blog_data.json')
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump({'posts': generate_posts(size)}, f, ensure_ascii=False)
+
+        port = free_port()
+        started = time.perf_counter()
+        process = start_server(data_file, port)
+        warmup = time.perf_counter() - started
+        try:
+            results = {'warmup_s': round(warmup, 2), 'routes': {}}
+            for route in ROUTES:
+                paths = list(route_paths(route, size, args.requests, rng))
+                results['routes'][route] = run_route(port, paths, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float):
+    """与基线对比，返回退化项列表"""
+    regressions = []
+    for size, result in current['sizes'].items():
+        base = baseline.get('sizes', {}).get(size)
+        if not base:
+            continue
+        for route, stats in result['routes'].items():
+            base_stats = base['routes'].get(route)
+            if not base_stats:
+                continue
+            if stats['p95_ms'] > base_stats['p95_ms'] * (1 + tolerance):
+                regressions.append(f"N={size} {route}: p95 {base_stats['p95_ms']}ms -> {stats['p95_ms']}ms")
+            if stats['throughput'] < base_stats['throughput'] * (1 - tolerance):
+                regressions.append(
+                    f"N={size} {route}: 吞吐 {base_stats['throughput']}/s -> {stats['throughput']}/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='app.py 路由压测')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='每个路由的请求数')
+    parser.add_argument('--save-baseline', help='将结果保存为基线 JSON')
+    parser.add_argument('--baseline', help='与基线 JSON 对比，发现退化时以非零状态退出')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='允许的相对退化比例')
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    current = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'concurrency': args.concurrency,
+        'requests': args.requests,
+        'python': sys.version.split()[0],
+        'sizes': {},
+    }
+    for size in args.sizes:
+        result = benchmark_size(size, args)
+        current['sizes'][str(size)] = result
+        print(f"\nN={size}（启动预热 {result['warmup_s']} 秒，并发 {args.concurrency}）")
+        print(f"{'路由':<14}{'吞吐(/s)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'错误':>6}")
+        for route, stats in result['routes'].items():
+            print(f"{route:<14}{stats['throughput']:>10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+                  f"{stats['p99_ms']:>10}{stats['errors']:>6}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(f"\n发现 {len(regressions)} 项性能退化（容差 {args.tolerance:.0%}）:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n与基线相比无退化（容差 {args.tolerance:.0%}）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""合成语料：按 blog_data.json 的格式生成中英混合文章；以及各基准共用的延迟统计"""
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+ZH_SENTENCES = [
+    '这波AI浪潮，开发个套壳工具，出售源码授权，销量爆表',
+    '程序员赚钱最稳妥的方法，就是给挖金人卖水',
+    '读书的意义在于让自己的思考更加清晰',
+    '也别整花活，就用PHP，开发迅速，部署简单，性能不错',
+    '书山有路勤为径，学海无涯苦作舟',
+    '副业的本质是用时间换取认知，再用认知换取收入',
+    '开源平台发一波，剩下就是等，只要产品好就会有客户',
+    '技术选型要考虑团队能力和维护成本',
+]
+EN_SENTENCES = [
+    'Building a fast web crawler in Python is mostly about avoiding blocking IO',
+    'Flask makes it easy to serve a small blog with a handful of routes',
+    'Search indexes trade memory for query latency',
+    'The best way to learn is to build something real and ship it',
+    'Caching is the art of remembering answers you already paid for',
+    'Profiling first, optimizing second, guessing never',
+]
+ZH_TITLE_WORDS = ['程序员', '如何', '赚钱', '人工智能', '创业', '读书', '笔记', '生活', '思考', '技术',
+                  '副业', '学习', '投资', '理财', '写作', '产品', '设计', '开源', '工具', '效率']
+EN_TITLE_WORDS = ['python', 'flask', 'crawler', 'guide', 'how', 'to', 'build', 'fast', 'web', 'data',
+                  'search', 'index', 'notes', 'learning', 'startup', 'design', 'open', 'source', 'tips', 'api']
+
+
+def percentile(samples, pct):
+    """样本的第 pct 百分位数（最近秩），无样本时为 0"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def _title(rng: random.Random, english: bool) -> str:
+    if english:
+        return ' '.join(rng.choice(EN_TITLE_WORDS) for _ in range(rng.randint(3, 7))).capitalize()
+    return ''.join(rng.choice(ZH_TITLE_WORDS) for _ in range(rng.randint(2, 5)))
+
+
+def _html_body(rng: random.Random, english: bool, paragraphs: int) -> str:
+    sentences = EN_SENTENCES if english else ZH_SENTENCES
+    blocks = []
+    for _ in range(paragraphs):
+        text = ('. ' if english else '。').join(rng.choice(sentences) for _ in range(rng.randint(1, 4)))
+        blocks.append(f"<div>{text}</div><div> </div>")
+    body = ''.join(blocks)
+    return (f'<div class="post-body entry-content" id="post-body-{rng.getrandbits(60)}" itemprop="articleBody">\n'
+            f'<div><div>{body}</div></div>\n<div style="clear: both;"></div>\n</div>')
+
+
+def _summary(html: str, max_length: int = 200) -> str:
+    import re
+    text = re.sub(r'<[^>]+>', '', html)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text if len(text) <= max_length else text[:max_length] + '...'
+
+
+def generate_posts(count: int, seed: int = 42, english_ratio: float = 0.1) -> List[Dict]:
+    """生成 count 篇文章（字段与 blog_data.json 一致，publish_date 为 ISO 字符串）"""
+    rng = random.Random(seed)
+    start_day = date(2015, 1, 1).toordinal()
+    end_day = date(2025, 8, 1).toordinal()
+    created = datetime(2025, 8, 5, 20, 0, 0)
+    posts = []
+    for i in range(count):
+        english = rng.random() < english_ratio
+        content = _html_body(rng, english, rng.choice([1, 2, 4, 8, 16, 32]))
+        created += timedelta(microseconds=rng.randint(100, 5000))
+        post = {
+            'title': _title(rng, english),
+            'url': f"https://example.blogspot.com/{2015 + i % 11}/{i % 12 + 1:02d}/post-{i}.html",
+            'content': content,
+            'summary': _summary(content),
+            'publish_date': date.fromordinal(rng.randint(start_day, end_day)).isoformat() if rng.random() < 0.4 else None,
+            'id': i + 1,
+            'created_at': created.isoformat(),
+        }
+        if rng.random() < 0.4:
+            post['source_page'] = 'https://example.blogspot.com/search?max-results=50'
+            post['crawl_time'] = created.isoformat()
+        else:
+            post['updated_at'] = created.isoformat()
+        if post['publish_date'] is None:
+            del post['publish_date']
+        posts.append(post)
+    return posts
@@ -11,7 +11,8 @@ from typing import List, Set, Dict
 import random
 import json
 import os
-from data_manager import data_manager
+import argparse
+from recrawl_scheduler import RecrawlScheduler, content_fingerprint
 
 # 配置日志
 logging.basicConfig(
@@ -24,8 +25,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def get_data_manager():
+    """全局数据管理器，首次使用时才导入：只抓取解析的进程（如分布式 worker）不会加载数据文件"""
+    from data_manager import data_manager
+    return data_manager
+
 class FastBlogCrawler:
-    def __init__(self, base_url, max_workers=10):
+    # 多种文章选择器
+    POST_SELECTORS = [
+        '.post',
+        '.blog-post',
+        'article',
+        '.entry',
+        '.post-outer',
+        '[class*="post"]'
+    ]
+    TITLE_SELECTOR = 'h1, h2, h3, .post-title, .entry-title, [class*="title"]'
+    
+    def __init__(self, base_url, max_workers=10, use_cache=True):
         self.base_url = base_url
         self.max_workers = max_workers
         self.session = requests.Session()
@@ -43,8 +60,9 @@ class FastBlogCrawler:
         self.posts_count = 0
         self.lock = threading.Lock()
         
-        # 加载缓存
-        self.load_cache()
+        # 加载缓存（use_cache 为 False 时跳过，例如分布式 worker 的去重由共享队列负责）
+        if use_cache:
+            self.load_cache()
         
         # 用户代理轮换
         self.user_agents = [
@@ -67,7 +85,7 @@ class FastBlogCrawler:
             
             # 从数据管理器加载已存在的文章URL
             existing_urls = set()
-            for post in data_manager.posts:
+            for post in get_data_manager().posts:
                 if post.get('url'):
                     existing_urls.add(post['url'])
             
@@ -234,28 +252,12 @@ class FastBlogCrawler:
         soup = BeautifulSoup(html_content, 'html.parser')
         posts = []
         
-        # 多种文章选择器
-        post_selectors = [
-            '.post',
-            '.blog-post',
-            'article',
-            '.entry',
-            '.post-outer',
-            '[class*="post"]'
-        ]
-        
-        post_elements = []
-        for selector in post_selectors:
-            elements = soup.select(selector)
-            if elements:
-                post_elements = elements
-                break
+        post_elements = self.select_post_elements(soup)
         
         for post_elem in post_elements:
             try:
                 # 提取标题
-                title_elem = post_elem.select_one('h1, h2, h3, .post-title, .entry-title, [class*="title"]')
-                title = title_elem.get_text(strip=True) if title_elem else "无标题"
+                title_elem = post_elem.select_one(self.TITLE_SELECTOR)
                 
                 # 提取链接
                 link_elem = post_elem.select_one('a[href]')
@@ -271,30 +273,9 @@ class FastBlogCrawler:
                 if post_url in self.crawled_urls:
                     continue
                 
-                # 提取内容
-                content_elem = post_elem.select_one('.post-body, .entry-content, .content, [class*="content"]')
-                content = content_elem.get_text(strip=True) if content_elem else ""
-                
-                # 提取日期
-                date_elem = post_elem.select_one('.published, .post-timestamp, .date, [class*="date"], time')
-                publish_date = None
-                if date_elem:
-                    date_text = date_elem.get_text(strip=True) or date_elem.get('datetime', '')
-                    publish_date = self.extract_date(date_text)
-                
-                # 生成摘要
-                summary = self.generate_summary(content)
-                
-                post_data = {
-                    'title': title,
-                    'url': post_url,
-                    'content': content,
-                    'summary': summary,
-                    'publish_date': publish_date,
-                    'source_page': page_url,
-                    'crawl_time': datetime.now().isoformat()
-                }
-                
+                post_data = self.extract_post_fields(post_elem)
+                post_data['url'] = post_url
+                post_data['source_page'] = page_url
                 posts.append(post_data)
                 
             except Exception as e:
@@ -303,12 +284,61 @@ class FastBlogCrawler:
         
         return posts
     
+    def select_post_elements(self, soup):
+        """按优先级尝试多种文章选择器"""
+        for selector in self.POST_SELECTORS:
+            elements = soup.select(selector)
+            if elements:
+                return elements
+        return []
+    
+    def extract_post_fields(self, post_elem, default_title="无标题"):
+        """从文章元素中提取标题、内容、日期和摘要"""
+        title_elem = post_elem.select_one(self.TITLE_SELECTOR)
+        title = title_elem.get_text(strip=True) if title_elem else default_title
+        
+        # 提取内容
+        content_elem = post_elem.select_one('.post-body, .entry-content, .content, [class*="content"]')
+        content = content_elem.get_text(strip=True) if content_elem else ""
+        
+        # 提取日期
+        date_elem = post_elem.select_one('.published, .post-timestamp, .date, [class*="date"], time')
+        publish_date = None
+        if date_elem:
+            date_text = date_elem.get_text(strip=True) or date_elem.get('datetime', '')
+            publish_date = self.extract_date(date_text)
+        
+        return {
+            'title': title,
+            'content': content,
+            'summary': self.generate_summary(content),
+            'publish_date': publish_date,
+            'crawl_time': datetime.now().isoformat()
+        }
+    
+    def parse_post_page(self, html_content, post_url):
+        """解析单篇文章页面（复查已有文章时使用）
+        
+        只返回页面上实际找到的字段：缺少标题时标题为空串，缺少日期时不含 publish_date，
+        也不含 source_page，更新时不会用占位值覆盖已有数据。
+        """
+        soup = BeautifulSoup(html_content, 'html.parser')
+        post_elements = self.select_post_elements(soup)
+        if not post_elements:
+            return None
+        post_data = self.extract_post_fields(post_elements[0], default_title='')
+        if post_data['publish_date'] is None:
+            del post_data['publish_date']
+        post_data['url'] = post_url
+        return post_data
+    
     def save_posts_batch(self, posts_batch):
         """批量保存文章到本地缓存"""
         if not posts_batch:
             return 0
         
         # 过滤已存在的文章
+        data_manager = get_data_manager()
         new_posts = []
         for post in posts_batch:
             if not data_manager.post_exists(post.get('url')):
@@ -366,17 +396,22 @@ class FastBlogCrawler:
         
         return posts
     
+    @staticmethod
+    def seed_urls(base_url):
+        """全量爬取的初始URL"""
+        return {
+            base_url,
+            f"{base_url}/search?max-results=50",
+            f"{base_url}/search?updated-max=2024-12-31T23:59:59%2B08:00&max-results=50"
+        }
+    
     def crawl_all_posts(self):
         """爬取所有文章 - 无数量限制，直到爬取完成"""
         logger.info(f"开始全量爬取，并发数: {self.max_workers}")
         logger.info(f"已缓存URL数量: {len(self.crawled_urls)}")
         
         # 初始URL
-        initial_urls = {
-            self.base_url,
-            f"{self.base_url}/search?max-results=50",
-            f"{self.base_url}/search?updated-max=2024-12-31T23:59:59%2B08:00&max-results=50"
-        }
+        initial_urls = self.seed_urls(self.base_url)
         
         # 过滤已爬取的URL
         new_initial_urls = initial_urls - self.crawled_urls
@@ -437,21 +472,83 @@ class FastBlogCrawler:
         
         return all_posts
 
+    def fetch_post_page(self, url):
+        """获取并解析单篇文章页面，失败时返回 None"""
+        html_content = self.get_page_content(url)
+        if not html_content:
+            return None
+        post = self.parse_post_page(html_content, url)
+        time.sleep(self.get_random_delay())
+        return post
+    
+    def recrawl_due_posts(self, limit=100, scheduler=None):
+        """增量复查：只抓取调度器中已到期的文章，内容有变化的原地更新"""
+        scheduler = scheduler or RecrawlScheduler()
+        data_manager = get_data_manager()
+        tracked = scheduler.track_posts(data_manager.posts)
+        due_urls = scheduler.due(limit=limit)
+        logger.info(f"复查调度: 跟踪URL {len(scheduler)} 个（新增 {tracked} 个），本轮到期 {len(due_urls)} 个")
+        
+        changed_posts = []
+        failed_count = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_url = {executor.submit(self.fetch_post_page, url): url for url in due_urls}
+            for future in as_completed(future_to_url):
+                url = future_to_url[future]
+                try:
+                    post = future.result()
+                except Exception as e:
+                    logger.error(f"复查失败 {url}: {e}")
+                    post = None
+                if post is not None and not (post.get('title') and post.get('content')):
+                    # 页面结构变化或返回了占位页时解析结果为空，按抓取失败处理，不记录指纹
+                    logger.warning(f"复查解析结果为空 {url}")
+                    post = None
+                if post is None:
+                    failed_count += 1
+                    scheduler.record(url, None)
+                    continue
+                if scheduler.record(url, content_fingerprint(post['title'], post['content'])):
+                    changed_posts.append(post)
+        
+        if changed_posts:
+            updated_count = data_manager.update_posts_batch(changed_posts)
+            data_manager.save_data()
+            logger.info(f"复查发现 {len(changed_posts)} 篇文章有修改，已更新 {updated_count} 篇")
+        logger.info(f"复查完成: 检查 {len(due_urls)} 篇，修改 {len(changed_posts)} 篇，失败 {failed_count} 篇")
+        
+        scheduler.compact()
+        scheduler.save()
+        return changed_posts
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='博客文章爬虫')
+    parser.add_argument('--recrawl', action='store_true', help='只复查已到期的已有文章')
+    parser.add_argument('--limit', type=int, default=100, help='每轮最多复查的文章数')
+    args = parser.parse_args()
+    
     base_url = 'https://hwv430.blogspot.com'
     max_workers = 10
     
     crawler = FastBlogCrawler(base_url, max_workers)
+    data_manager = get_data_manager()
     
     start_time = time.time()
-    posts = crawler.crawl_all_posts()
+    if args.recrawl:
+        posts = crawler.recrawl_due_posts(args.limit)
+    else:
+        posts = crawler.crawl_all_posts()
     end_time = time.time()
     
     logger.info(f"爬取耗时: {end_time - start_time:.2f} 秒")
     if posts:
         logger.info(f"平均速度: {len(posts) / (end_time - start_time):.2f} 篇/秒")
     
+    if posts:
+        # 新文章入库时已补全元数据，结果写入与 Web 应用共享的富化缓存
+        logger.info(f"富化缓存: {data_manager.get_cache_stats()}")
+    
     # 显示统计信息
     stats = data_manager.get_stats() if hasattr(data_manager, 'get_stats') else {}
     logger.info(f"数据库统计: {stats}")
@@ -1,106 +1,439 @@
 import json
 import os
 from datetime import datetime, date
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator
 import threading
-from collections import defaultdict
+from bisect import bisect_left
 import re
-from langdetect import detect
+from langdetect import detect, DetectorFactory
 import jieba
 from collections import Counter
+from suggest_index import SuggestIndex
+from post_store import Post, PostColumns, timestamp_from_iso
+from view_counter import ViewCounter
+from enrichment_cache import EnrichmentCache, make_key, open_enrichment_cache
+from facet_index import FACETS, FacetIndex, bitmap_from_positions, bitmap_positions, popcount
+
+# 固定 langdetect 的随机种子，使同一文本的检测结果稳定
+DetectorFactory.seed = 0
+
+# 富化缓存键中的分词器版本：分词、停用词或关键词规则变化时递增末尾的版本号
+TOKENIZER_VERSION = f"jieba-{getattr(jieba, '__version__', 'unknown')}/1"
+
+class DataSnapshot:
+    """不可变的数据快照：文章元组及其派生索引
+    
+    快照发布后文章集合和文章对象都不再修改。派生索引按需构建，
+    只会从 None 变为确定的构建结果，因此读者无需加锁即可并发访问。
+    """
+    
+    def __init__(self, posts, version: int = 0, scored_on: Optional[date] = None,
+                 suggest_index: Optional[SuggestIndex] = None):
+        self.posts = tuple(posts)
+        self.version = version
+        # 热度分数计算的日期；不是当天时由 process_posts_metadata 重算
+        # （发布前写者已补全语言、关键词和热度，快照中的文章元数据总是完整的）
+        self.scored_on = scored_on
+        self.suggest_index = suggest_index
+        self.url_index = None
+        self.id_index = None
+        self.date_index = None
+        self.columns = None
+        self.facet_index = None
+        # 叠加浏览分数后的排名：exclude_language -> (浏览分数版本, 下标数组)
+        self.view_rankings = {}
 
 class BlogDataManager:
-    def __init__(self, data_file='blog_data.json'):
+    # 复查时可被重新抓取的内容覆盖的字段
+    UPDATABLE_FIELDS = ('title', 'content', 'summary')
+    
+    def __init__(self, data_file='blog_data.json', enrichment_cache: Optional[EnrichmentCache] = None):
         self.data_file = data_file
-        self.posts = []
+        # 语言检测和关键词提取结果的持久化缓存，默认与数据文件放在同一目录；
+        # 环境变量 ENRICHMENT_CACHE 可指定路径，设为 off 关闭，设为 memory 使用进程内缓存
+        if enrichment_cache is None:
+            enrichment_cache = open_enrichment_cache(
+                os.environ.get('ENRICHMENT_CACHE'),
+                os.path.join(os.path.dirname(data_file), 'enrichment_cache.db'))
+        self.enrichment_cache = enrichment_cache
+        # 写者互斥锁；读者只读取当前快照引用，不加锁
         self.lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._snapshot = DataSnapshot(())
+        # 浏览计数（分片计数，后台批量汇总为时间衰减分数）
+        self.views = ViewCounter()
         self.load_data()
     
+    @property
+    def posts(self):
+        """当前快照中的全部文章（只读元组）"""
+        return self._snapshot.posts
+    
+    def snapshot(self) -> DataSnapshot:
+        """获取当前数据快照"""
+        return self._snapshot
+    
+    def _publish(self, posts, scored_on: Optional[date] = None,
+                 suggest_index: Optional[SuggestIndex] = None) -> DataSnapshot:
+        """发布新快照（调用方需持有写锁）
+        
+        派生索引在发布前由写者构建完成，读者拿到的快照总是完整的；
+        发布本身只是一次原子的引用赋值。
+        """
+        snapshot = DataSnapshot(posts, self._snapshot.version + 1, scored_on, suggest_index)
+        self._get_url_index(snapshot)
+        self._get_id_index(snapshot)
+        self._get_date_index(snapshot)
+        self._get_columns(snapshot)
+        self._snapshot = snapshot
+        return snapshot
+    
     def load_data(self):
         """从JSON文件加载数据"""
+        posts = []
         if os.path.exists(self.data_file):
             try:
                 with open(self.data_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self.posts = data.get('posts', [])
-                    for post in self.posts:
-                        if post.get('publish_date'):
-                            post['publish_date'] = datetime.fromisoformat(post['publish_date']).date()
+                    posts = [Post.from_dict(post) for post in data.get('posts', [])]
             except Exception as e:
                 print(f"加载数据失败: {e}")
-                self.posts = []
-        else:
-            self.posts = []
+                posts = []
+        with self.lock:
+            # 发布前补全元数据并按当天计算热度（已保存过的文章只需重算热度）
+            for post in posts:
+                self._enrich_post(post)
+            self.enrichment_cache.flush()
+            self._publish(posts, scored_on=date.today())
     
     def save_data(self):
-        """保存数据到JSON文件"""
-        with self.lock:
+        """保存数据到JSON文件
+        
+        序列化的是调用时的快照，不阻塞写者和读者；先写临时文件再原子替换。
+        快照在保存锁内读取，并发保存时后写入的总是较新的快照。
+        """
+        with self._save_lock:
+            snapshot = self._snapshot
             try:
                 data_to_save = []
-                for post in self.posts:
-                    post_copy = post.copy()
+                for post in snapshot.posts:
+                    post_copy = post.to_dict()
                     if isinstance(post_copy.get('publish_date'), date):
                         post_copy['publish_date'] = post_copy['publish_date'].isoformat()
                     data_to_save.append(post_copy)
                 
-                with open(self.data_file, 'w', encoding='utf-8') as f:
+                tmp_file = f"{self.data_file}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
                     json.dump({'posts': data_to_save}, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.data_file)
             except Exception as e:
                 print(f"保存数据失败: {e}")
     
     def add_posts_batch(self, posts_list: List[Dict]):
-        """批量添加文章"""
-        added_count = 0
+        """批量添加文章（字典或 Post 对象，Post 对象会被复制）"""
         with self.lock:
-            for post_data in posts_list:
-                if not self.post_exists(post_data.get('url')):
-                    post_data['id'] = len(self.posts) + 1
-                    post_data['created_at'] = datetime.now().isoformat()
-                    self.posts.append(post_data)
-                    added_count += 1
-        return added_count
+            known_urls = set(self._get_url_index())
+            # 生成器按需复制，批内重复和已有的文章不会被复制
+            new_posts = (post.copy() if isinstance(post, Post) else Post.from_dict(post)
+                         for post in posts_list if post.get('url') not in known_urls)
+            return self._append_posts(new_posts, known_urls)
+    
+    def _append_posts(self, new_posts: Iterable[Post], known_urls: set) -> int:
+        """追加文章并发布快照（调用方需持有写锁），返回新增数
+        
+        直接接管传入的 Post 对象，不再复制；按 known_urls 去重，分配 id 并补全元数据。
+        """
+        snapshot = self._snapshot
+        posts = list(snapshot.posts)
+        added = []
+        for post in new_posts:
+            url = post.get('url')
+            if url in known_urls:
+                continue
+            known_urls.add(url)
+            post['id'] = len(posts) + 1
+            if not post.get('created_at'):
+                post['created_at'] = datetime.now().isoformat()
+            self._enrich_post(post)
+            posts.append(post)
+            added.append(post)
+        
+        if added:
+            self.enrichment_cache.flush()
+            # 补全索引写时复制后增量更新，无需重建
+            suggest_index = snapshot.suggest_index
+            if suggest_index is not None:
+                suggest_index = suggest_index.copy()
+                suggest_index.add(self._suggest_entries(added))
+            self._publish(posts, scored_on=snapshot.scored_on, suggest_index=suggest_index)
+        return len(added)
+    
+    def update_posts_batch(self, posts_list: List[Dict]) -> int:
+        """批量更新已有文章（按URL匹配），返回更新的文章数
+        
+        只覆盖 UPDATABLE_FIELDS 中非空且与原值不同的字段，解析失败时的空值或占位值不会覆盖已有数据；
+        有字段变化的文章复制后替换并记录 updated_at，id、created_at 等其余字段保持不变，
+        语言、关键词和热度在发布前按新内容重新计算。
+        补全索引不支持删除词条，因此直接丢弃，首次查询时重建。
+        """
+        changes = {post.get('url'): post for post in posts_list if post.get('url')}
+        if not changes:
+            return 0
+        updated_count = 0
+        with self.lock:
+            snapshot = self._snapshot
+            if not changes.keys() & self._get_url_index(snapshot):
+                return 0
+            now = datetime.now().isoformat()
+            posts = list(snapshot.posts)
+            for i, post in enumerate(posts):
+                change = changes.get(post.get('url'))
+                if change is None:
+                    continue
+                fields = {key: change[key] for key in self.UPDATABLE_FIELDS
+                          if change.get(key) and change[key] != post.get(key)}
+                if not fields:
+                    continue
+                updated = post.copy()
+                for key in ('language', 'keywords', 'popularity_score'):
+                    if key in updated:
+                        del updated[key]
+                for key, value in fields.items():
+                    updated[key] = value
+                updated['updated_at'] = change.get('updated_at') or now
+                self._enrich_post(updated)
+                posts[i] = updated
+                updated_count += 1
+            if updated_count:
+                self.enrichment_cache.flush()
+                self._publish(posts, scored_on=snapshot.scored_on)
+        return updated_count
+    
+    def iter_export(self, since: Optional[str] = None, fields: Optional[List[str]] = None) -> Iterator[Dict]:
+        """逐篇导出文章（基于调用时的快照，不构建完整列表）
+        
+        since 为 ISO 时间，只导出 created_at 或 updated_at 不早于该时间的文章；
+        fields 指定导出的字段，默认全部。格式错误时抛出 ValueError。
+        """
+        since_value = timestamp_from_iso(since) if since else None
+        snapshot = self._snapshot
+        for post in snapshot.posts:
+            if since_value is not None:
+                modified = post.modified_at()
+                if modified is None or modified < since_value:
+                    continue
+            if fields:
+                data = {field: post[field] for field in fields if field in post}
+            else:
+                data = post.to_dict()
+            if isinstance(data.get('publish_date'), date):
+                data['publish_date'] = data['publish_date'].isoformat()
+            yield data
+    
+    def import_ndjson(self, lines: Iterable, batch_size: int = 500) -> Dict[str, int]:
+        """流式导入 NDJSON：逐行解析并按URL去重，最后一次性入库并保存
+        
+        不读入整个文件，重复行解析后即丢弃；新文章每 batch_size 篇在写锁外补全一次元数据，
+        入库时直接接管这些 Post 对象，不再复制。全部行解析完成后只发布一次快照，
+        索引只重建一次，导入耗时与行数成线性关系。
+        """
+        result = {'read': 0, 'added': 0, 'skipped': 0, 'errors': 0}
+        known_urls = self._get_url_index()
+        seen = set()
+        new_posts = []
+        batch = []
+        for line_number, line in enumerate(lines, 1):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                post = json.loads(line)
+                if not isinstance(post, dict) or not post.get('url'):
+                    raise ValueError('缺少 url 字段')
+            except ValueError as e:
+                print(f"第 {line_number} 行解析失败: {e}")
+                result['errors'] += 1
+                continue
+            result['read'] += 1
+            url = post['url']
+            if url in known_urls or url in seen:
+                continue
+            seen.add(url)
+            post.pop('id', None)
+            batch.append(Post.from_dict(post))
+            if len(batch) >= batch_size:
+                self._enrich_batch(batch)
+                new_posts.extend(batch)
+                batch = []
+        if batch:
+            self._enrich_batch(batch)
+            new_posts.extend(batch)
+        if new_posts:
+            with self.lock:
+                # 解析期间其他写者可能已加入相同URL，在写锁内按最新快照再次去重
+                result['added'] = self._append_posts(new_posts, set(self._get_url_index()))
+        result['skipped'] = result['read'] - result['added']
+        if result['added']:
+            self.save_data()
+        return result
+    
+    def _enrich_batch(self, posts: List[Post]):
+        """补全一批尚未发布的文章的元数据并提交富化缓存"""
+        for post in posts:
+            self._enrich_post(post)
+        self.enrichment_cache.flush()
+    
+    def _get_url_index(self, snapshot: DataSnapshot = None) -> set:
+        """获取快照中全部文章URL的集合"""
+        snapshot = snapshot or self._snapshot
+        if snapshot.url_index is None:
+            snapshot.url_index = frozenset(post.get('url') for post in snapshot.posts)
+        return snapshot.url_index
+    
+    def _get_columns(self, snapshot: DataSnapshot = None) -> PostColumns:
+        """获取列式视图（热度排序、内容统计在列上批量计算）"""
+        snapshot = snapshot or self._snapshot
+        if snapshot.columns is None:
+            snapshot.columns = PostColumns(snapshot.posts)
+        return snapshot.columns
+    
+    def _get_facet_index(self, snapshot: DataSnapshot = None) -> FacetIndex:
+        """获取分面位图索引（首次搜索时构建）"""
+        snapshot = snapshot or self._snapshot
+        if snapshot.facet_index is None:
+            snapshot.facet_index = FacetIndex(self._get_columns(snapshot))
+        return snapshot.facet_index
+    
+    def _get_id_index(self, snapshot: DataSnapshot = None) -> Dict[int, Dict]:
+        """获取 id -> 文章 的映射"""
+        snapshot = snapshot or self._snapshot
+        if snapshot.id_index is None:
+            snapshot.id_index = {post.get('id'): post for post in snapshot.posts}
+        return snapshot.id_index
+    
+    def _get_date_index(self, snapshot: DataSnapshot = None) -> Dict:
+        """获取按发布日期排序的索引
+        
+        ordinals/ids 为按 (publish_date, id) 升序排列的平行数组，
+        months/years 记录每个年月、年份在数组中的 [lo, hi) 区间。
+        """
+        snapshot = snapshot or self._snapshot
+        if snapshot.date_index is None:
+            snapshot.date_index = self._build_date_index(snapshot.posts)
+        return snapshot.date_index
+    
+    def _build_date_index(self, posts: List[Dict]) -> Dict:
+        """构建日期索引"""
+        entries = []
+        for post in posts:
+            publish_date = post.get('publish_date')
+            if not publish_date:
+                continue
+            try:
+                if isinstance(publish_date, str):
+                    publish_date = datetime.fromisoformat(publish_date).date()
+                entries.append((publish_date.toordinal(), post.get('id', 0)))
+            except Exception:
+                continue
+        entries.sort()
+        
+        ordinals = [ordinal for ordinal, _ in entries]
+        ids = [post_id for _, post_id in entries]
+        
+        # 预计算年月分桶：每个月只需一次二分查找
+        months = {}
+        years = {}
+        lo = 0
+        while lo < len(ordinals):
+            day = date.fromordinal(ordinals[lo])
+            if day.month == 12:
+                next_month = date(day.year + 1, 1, 1)
+            else:
+                next_month = date(day.year, day.month + 1, 1)
+            hi = bisect_left(ordinals, next_month.toordinal(), lo)
+            months[(day.year, day.month)] = (lo, hi)
+            year_lo = years.get(day.year, (lo, hi))[0]
+            years[day.year] = (year_lo, hi)
+            lo = hi
+        
+        return {
+            'ordinals': ordinals,
+            'ids': ids,
+            'months': months,
+            'years': years,
+            'groups': [
+                {'year': year, 'month': month, 'count': hi - lo}
+                for (year, month), (lo, hi) in sorted(months.items(), reverse=True)
+            ]
+        }
     
     def post_exists(self, url: str) -> bool:
         """检查文章是否已存在"""
-        return any(post.get('url') == url for post in self.posts)
+        return url in self._get_url_index()
+    
+    @staticmethod
+    def _clean_text(text: str) -> str:
+        """清理HTML标签并合并空白"""
+        clean_text = re.sub(r'<[^>]+>', '', text)
+        return re.sub(r'\s+', ' ', clean_text).strip()
     
     def detect_language(self, text: str) -> str:
-        """检测文本语言"""
+        """检测文本语言（结果按清洗后的文本缓存）"""
         try:
-            # 清理HTML标签
-            clean_text = re.sub(r'<[^>]+>', '', text)
-            clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+            clean_text = self._clean_text(text)
             
             if len(clean_text) < 10:
                 return 'unknown'
             
-            lang = detect(clean_text)
+            key = make_key('language', TOKENIZER_VERSION, clean_text)
+            cached = self.enrichment_cache.get(key)
+            if cached is not None:
+                return cached['language']
+            
+            try:
+                lang = detect(clean_text)
+            except Exception:
+                lang = 'unknown'
+            self.enrichment_cache.put(key, {'language': lang})
             return lang
         except Exception:
             return 'unknown'
     
+    def tokenize(self, clean_text: str, lang: str = 'zh') -> List[str]:
+        """分词并过滤停用词和短词"""
+        if lang == 'zh':
+            # 中文分词
+            words = jieba.cut(clean_text)
+            # 过滤停用词和短词
+            stop_words = {'的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '一个', '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没有', '看', '好', '自己', '这'}
+            filtered_words = [word for word in words if len(word) > 1 and word not in stop_words and word.strip()]
+        else:
+            # 英文处理
+            words = re.findall(r'\b[a-zA-Z]{3,}\b', clean_text.lower())
+            stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'between', 'among', 'this', 'that', 'these', 'those', 'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers', 'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can'}
+            filtered_words = [word for word in words if word not in stop_words]
+        
+        return filtered_words
+    
     def extract_keywords(self, text: str, lang: str = 'zh', top_k: int = 5) -> List[str]:
-        """提取关键词"""
+        """提取关键词（结果按清洗后的文本、语言和分词器版本缓存）"""
         try:
-            # 清理HTML标签
-            clean_text = re.sub(r'<[^>]+>', '', text)
-            clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+            clean_text = self._clean_text(text)
             
-            if lang == 'zh':
-                # 中文分词
-                words = jieba.cut(clean_text)
-                # 过滤停用词和短词
-                stop_words = {'的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '一个', '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没有', '看', '好', '自己', '这'}
-                filtered_words = [word for word in words if len(word) > 1 and word not in stop_words and word.strip()]
-            else:
-                # 英文处理
-                words = re.findall(r'\b[a-zA-Z]{3,}\b', clean_text.lower())
-                stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'between', 'among', 'this', 'that', 'these', 'those', 'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers', 'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can'}
-                filtered_words = [word for word in words if word not in stop_words]
+            key = make_key('keywords', TOKENIZER_VERSION, lang, top_k, clean_text)
+            cached = self.enrichment_cache.get(key)
+            if cached is not None:
+                return cached['keywords']
+            
+            tokens = self.tokenize(clean_text, lang)
             
             # 统计词频
-            word_count = Counter(filtered_words)
-            return [word for word, count in word_count.most_common(top_k)]
+            word_count = Counter(tokens)
+            keywords = [word for word, count in word_count.most_common(top_k)]
+            self.enrichment_cache.put(key, {'keywords': keywords})
+            return keywords
         except Exception:
             return []
     
@@ -151,223 +484,308 @@ class BlogDataManager:
         
         return score
     
-    def process_posts_metadata(self):
-        """处理文章元数据（语言检测、关键词提取、热度计算）"""
-        with self.lock:
-            for post in self.posts:
-                # 检测语言
-                if 'language' not in post:
-                    text_to_detect = f"{post.get('title', '')} {post.get('summary', '')}"
-                    post['language'] = self.detect_language(text_to_detect)
-                
-                # 提取关键词
-                if 'keywords' not in post:
-                    text_for_keywords = f"{post.get('title', '')} {post.get('content', '')}"
-                    post['keywords'] = self.extract_keywords(text_for_keywords, post.get('language', 'zh'))
-                
-                # 计算热度分数
-                post['popularity_score'] = self.calculate_popularity_score(post)
+    def _enrich_post(self, post: Post) -> bool:
+        """补全尚未发布的文章的语言和关键词并计算热度（原地修改），返回是否新提取了关键词"""
+        extracted = False
+        if 'language' not in post:
+            text_to_detect = f"{post.get('title', '')} {post.get('summary', '')}"
+            post['language'] = self.detect_language(text_to_detect)
+        if 'keywords' not in post:
+            text_for_keywords = f"{post.get('title', '')} {post.get('content', '')}"
+            post['keywords'] = self.extract_keywords(text_for_keywords, post.get('language', 'zh'))
+            extracted = True
+        post['popularity_score'] = self.calculate_popularity_score(post)
+        return extracted
+    
+    def process_posts_metadata(self) -> DataSnapshot:
+        """按当天日期重算热度分数，返回可直接使用的快照
+        
+        写者在发布前已补全语言、关键词和热度，读者拿到的快照总是完整的；这里只处理跨天后的热度重算。
+        需要变更的文章先复制再修改，处理完成后发布新快照。若其他线程正在写入，
+        则直接返回当前快照（热度按前一天计算），不阻塞读者。
+        """
+        # 热度只依赖文章字段和当天日期：快照当天已处理过则无需重算
+        today = date.today()
+        snapshot = self._snapshot
+        if snapshot.scored_on == today:
+            return snapshot
+        if not self.lock.acquire(blocking=False):
+            return snapshot
+        try:
+            snapshot = self._snapshot
+            if snapshot.scored_on == today:
+                return snapshot
+            
+            posts = []
+            enriched_posts = []
+            changed = False
+            for post in snapshot.posts:
+                if 'language' not in post or 'keywords' not in post:
+                    updated = post.copy()
+                    if self._enrich_post(updated):
+                        enriched_posts.append(updated)
+                else:
+                    score = self.calculate_popularity_score(post)
+                    if score == post.get('popularity_score'):
+                        posts.append(post)
+                        continue
+                    updated = post.copy()
+                    updated['popularity_score'] = score
+                changed = True
+                posts.append(updated)
+            
+            # 提交本次新写入富化缓存的结果
+            self.enrichment_cache.flush()
+            
+            suggest_index = snapshot.suggest_index
+            # 新提取的关键词增量加入补全索引（标题已在入库时加入）
+            if enriched_posts and suggest_index is not None:
+                suggest_index = suggest_index.copy()
+                suggest_index.add(
+                    (keyword, 'keyword', None, post['popularity_score'])
+                    for post in enriched_posts
+                    for keyword in post['keywords']
+                )
+            
+            if changed:
+                snapshot = self._publish(posts, scored_on=today, suggest_index=suggest_index)
+            else:
+                snapshot.scored_on = today
+            return snapshot
+        finally:
+            self.lock.release()
     
     def get_filtered_posts(self, filter_english: bool = False, page: int = 1, per_page: int = 12) -> Dict:
         """获取过滤后的文章（可选择过滤纯英文文章）"""
-        # 确保元数据已处理
-        self.process_posts_metadata()
-        
-        filtered_posts = self.posts
-        
-        if filter_english:
-            # 过滤掉纯英文文章
-            filtered_posts = [post for post in self.posts if post.get('language', 'unknown') != 'en']
-        
-        # 按热度排序
-        sorted_posts = sorted(filtered_posts, key=lambda x: x.get('popularity_score', 0), reverse=True)
+        # 跨天后按当天重算热度
+        snapshot = self.process_posts_metadata()
+        columns = self._get_columns(snapshot)
+        # 按热度（含浏览分数）排序
+        order = self._get_ranking(snapshot, exclude_language='en' if filter_english else None)
         
         start = (page - 1) * per_page
         end = start + per_page
+        total = len(order)
         
         return {
-            'posts': sorted_posts[start:end],
-            'total': len(sorted_posts),
+            'posts': [columns.posts[i] for i in order[start:end]],
+            'total': total,
             'page': page,
             'per_page': per_page,
-            'pages': (len(sorted_posts) + per_page - 1) // per_page
+            'pages': (total + per_page - 1) // per_page
         }
     
+    def _get_ranking(self, snapshot: DataSnapshot, exclude_language: Optional[str] = None):
+        """热度排名：列式视图中缓存的基础排名叠加浏览加分，按浏览分数版本缓存在快照上"""
+        order = self._get_columns(snapshot).ranking(exclude_language)
+        version, bonuses = self.views.boosts()
+        if not bonuses:
+            return order
+        cached = snapshot.view_rankings.get(exclude_language)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        order = snapshot.columns.boosted_ranking(order, bonuses)
+        snapshot.view_rankings[exclude_language] = (version, order)
+        return order
+    
+    def record_view(self, post_id: int):
+        """记录文章浏览（不加锁，批量汇总后影响热度排序）"""
+        self.views.record(post_id)
+    
     def get_all_posts(self, page: int = 1, per_page: int = 12) -> Dict:
         """获取所有文章（过滤纯英文，按热度排序）"""
         return self.get_filtered_posts(filter_english=True, page=page, per_page=per_page)
     
-    def search_posts(self, query: str, page: int = 1, per_page: int = 12) -> Dict:
-        """搜索文章"""
-        query_lower = query.lower()
-        filtered_posts = []
-        
-        for post in self.posts:
-            if (query_lower in post.get('title', '').lower() or 
-                query_lower in post.get('content', '').lower() or 
-                query_lower in post.get('summary', '').lower()):
-                filtered_posts.append(post)
-        
-        sorted_posts = sorted(filtered_posts, key=lambda x: x.get('id', 0), reverse=True)
+    def search_posts(self, query: str = '', page: int = 1, per_page: int = 12,
+                     filters: Optional[Dict[str, List[str]]] = None, sort: str = 'id',
+                     facet_limit: int = 20) -> Dict:
+        """搜索文章，支持分面筛选
+        
+        filters 为 分面 -> 取值列表（分面见 facet_index.FACETS），同一分面内取并集、
+        不同分面取交集；sort 为 'id'（最新入库在前）或 'popularity'（热度）。
+        返回结果附带各分面的取值计数。分面或排序方式无效时抛出 ValueError。
+        """
+        filters = {facet: list(values) for facet, values in (filters or {}).items() if values}
+        unknown = set(filters) - set(FACETS)
+        if unknown:
+            raise ValueError(f"未知的分面: {', '.join(sorted(unknown))}")
+        if sort not in ('id', 'popularity'):
+            raise ValueError(f"未知的排序方式: {sort}")
+        
+        # 语言和关键词分面依赖元数据
+        snapshot = self.process_posts_metadata()
+        facets = self._get_facet_index(snapshot)
+        columns = facets.columns
+        
+        base = facets.all
+        if query:
+            # 文本匹配不受筛选条件限制：某分面的计数需要忽略该分面自身的筛选条件
+            query_lower = query.lower()
+            matched = []
+            for i, post in enumerate(columns.posts):
+                if (query_lower in post.get('title', '').lower() or 
+                    query_lower in post.get('content', '').lower() or 
+                    query_lower in post.get('summary', '').lower()):
+                    matched.append(i)
+            base = bitmap_from_positions(matched, facets.size)
+        result = facets.match(filters, base)
         
         start = (page - 1) * per_page
         end = start + per_page
+        if sort == 'popularity':
+            # 沿热度排名依次检查是否命中，取够当前页即停止
+            data = result.to_bytes((facets.size + 7) // 8, 'little')
+            positions = []
+            for i in self._get_ranking(snapshot):
+                if data[i >> 3] >> (i & 7) & 1:
+                    positions.append(i)
+                    if len(positions) >= end:
+                        break
+        else:
+            ids = columns.ids
+            positions = sorted(bitmap_positions(result), key=lambda i: ids[i], reverse=True)
+        total = popcount(result)
         
         return {
-            'posts': sorted_posts[start:end],
-            'total': len(sorted_posts),
+            'posts': [columns.posts[i] for i in positions[start:end]],
+            'total': total,
             'page': page,
             'per_page': per_page,
-            'pages': (len(sorted_posts) + per_page - 1) // per_page
+            'pages': (total + per_page - 1) // per_page,
+            'filters': filters,
+            'sort': sort,
+            'facets': facets.facet_counts(base, filters, facet_limit)
         }
     
+    def _suggest_entries(self, posts: List[Dict]):
+        """生成补全索引词条：标题与关键词，按热度加权"""
+        for post in posts:
+            score = post.get('popularity_score')
+            if score is None:
+                score = self.calculate_popularity_score(post)
+            yield post.get('title', ''), 'title', post.get('id'), score
+            for keyword in post.get('keywords', []):
+                yield keyword, 'keyword', None, score
+    
+    def get_suggestions(self, query: str, limit: int = 10) -> List[Dict]:
+        """搜索补全：返回以 query 为前缀的标题和关键词"""
+        snapshot = self._snapshot
+        if snapshot.suggest_index is None:
+            # 首次构建需要关键词和热度，之后由写者随新快照增量维护
+            snapshot = self.process_posts_metadata()
+            if snapshot.suggest_index is None:
+                index = SuggestIndex()
+                index.build(self._suggest_entries(snapshot.posts))
+                snapshot.suggest_index = index
+        return snapshot.suggest_index.suggest(query, limit)
+    
     def get_post_by_id(self, post_id: int) -> Optional[Dict]:
         """根据ID获取文章"""
-        for post in self.posts:
-            if post.get('id') == post_id:
-                return post
-        return None
+        return self._get_id_index().get(post_id)
     
     def get_date_groups(self) -> List[Dict]:
         """获取按年月分组的文章统计"""
-        date_counts = defaultdict(int)
-        
-        for post in self.posts:
-            publish_date = post.get('publish_date')
-            if publish_date:
-                if isinstance(publish_date, str):
-                    publish_date = datetime.fromisoformat(publish_date).date()
-                key = (publish_date.year, publish_date.month)
-                date_counts[key] += 1
-        
-        result = []
-        for (year, month), count in sorted(date_counts.items(), reverse=True):
-            result.append({
-                'year': year,
-                'month': month,
-                'count': count
-            })
-        
-        return result
+        return [dict(group) for group in self._get_date_index()['groups']]
     
     def get_posts_by_date(self, year: int = None, month: int = None, page: int = 1, per_page: int = 12) -> Dict:
-        """按年月获取文章"""
-        filtered_posts = []
-        
-        for post in self.posts:
-            publish_date = post.get('publish_date')
-            if publish_date:
-                if isinstance(publish_date, str):
-                    publish_date = datetime.fromisoformat(publish_date).date()
-                
-                if year and publish_date.year != year:
-                    continue
-                if month and publish_date.month != month:
-                    continue
-                
-                filtered_posts.append(post)
-        
-        sorted_posts = sorted(filtered_posts, key=lambda x: x.get('publish_date', date.min), reverse=True)
+        """按年月获取文章（基于日期索引，按发布日期倒序）"""
+        snapshot = self._snapshot
+        index = self._get_date_index(snapshot)
+        
+        if year and month:
+            lo, hi = index['months'].get((year, month), (0, 0))
+        elif year:
+            lo, hi = index['years'].get(year, (0, 0))
+        elif month:
+            # 仅指定月份时合并各年份的同月区间
+            ranges = [bounds for (y, m), bounds in index['months'].items() if m == month]
+            return self._paginate_date_ranges(snapshot, sorted(ranges, reverse=True), page, per_page)
+        else:
+            lo, hi = 0, len(index['ids'])
         
-        start = (page - 1) * per_page
+        return self._paginate_date_ranges(snapshot, [(lo, hi)], page, per_page)
+    
+    def _paginate_date_ranges(self, snapshot: DataSnapshot, ranges: List[tuple], page: int, per_page: int) -> Dict:
+        """对若干个按时间倒序排列的索引区间分页"""
+        index = self._get_date_index(snapshot)
+        id_index = self._get_id_index(snapshot)
+        total = sum(hi - lo for lo, hi in ranges)
+        start = max(page - 1, 0) * per_page
         end = start + per_page
         
+        page_ids = []
+        offset = 0
+        for lo, hi in ranges:
+            size = hi - lo
+            if offset + size > start and offset < end:
+                # 区间内倒序取 [start - offset, end - offset)
+                first = max(start - offset, 0)
+                last = min(end - offset, size)
+                page_ids.extend(reversed(index['ids'][hi - last:hi - first]))
+            offset += size
+            if offset >= end:
+                break
+        
+        posts = [id_index[post_id] for post_id in page_ids if post_id in id_index]
+        
         return {
-            'posts': sorted_posts[start:end],
-            'total': len(sorted_posts),
+            'posts': posts,
+            'total': total,
             'page': page,
             'per_page': per_page,
-            'pages': (len(sorted_posts) + per_page - 1) // per_page
+            'pages': (total + per_page - 1) // per_page
         }
 
     def get_stats(self) -> Dict:
         """获取博客统计信息"""
-        # 确保元数据已处理
-        self.process_posts_metadata()
-        
+        # 跨天后按当天重算热度
+        snapshot = self.process_posts_metadata()
         stats = {
-            'total_posts': len(self.posts),
+            'total_posts': len(snapshot.posts),
             'yearly_stats': {},
             'recent_posts': 0,  # 最近30天
         }
         
-        if not self.posts:
+        if not snapshot.posts:
             return stats
         
-        yearly_count = defaultdict(int)
-        recent_count = 0
-        
-        current_date = date.today()
-        
-        for post in self.posts:
-            # 日期统计
-            publish_date = post.get('publish_date')
-            if publish_date:
-                try:
-                    if isinstance(publish_date, str):
-                        publish_date = datetime.fromisoformat(publish_date).date()
-                    
-                    # 年度统计
-                    year = publish_date.year
-                    yearly_count[year] += 1
-                    
-                    # 最近30天统计
-                    days_diff = (current_date - publish_date).days
-                    if days_diff <= 30:
-                        recent_count += 1
-                        
-                except Exception:
-                    pass
-        
-        # 整理统计结果
-        stats['yearly_stats'] = dict(yearly_count)
-        stats['recent_posts'] = recent_count
+        # 年度统计与最近30天统计均可直接从日期索引的区间得到
+        index = self._get_date_index(snapshot)
+        stats['yearly_stats'] = {
+            year: hi - lo for year, (lo, hi) in sorted(index['years'].items(), reverse=True)
+        }
+        recent_start = bisect_left(index['ordinals'], date.today().toordinal() - 30)
+        stats['recent_posts'] = len(index['ordinals']) - recent_start
         
         return stats
     
+    def get_cache_stats(self) -> Dict:
+        """富化缓存的容量与命中率"""
+        return self.enrichment_cache.stats()
+    
     def get_language_distribution(self) -> Dict[str, int]:
         """获取语言分布统计"""
-        self.process_posts_metadata()
-        language_count = defaultdict(int)
-        
-        for post in self.posts:
-            lang = post.get('language', 'unknown')
-            language_count[lang] += 1
-        
-        return dict(language_count)
+        snapshot = self.process_posts_metadata()
+        return self._get_columns(snapshot).language_distribution()
     
     def get_monthly_trend(self, months: int = 12) -> List[Dict]:
         """获取月度发布趋势"""
-        monthly_count = defaultdict(int)
-        
-        for post in self.posts:
-            publish_date = post.get('publish_date')
-            if publish_date:
-                try:
-                    if isinstance(publish_date, str):
-                        publish_date = datetime.fromisoformat(publish_date).date()
-                    
-                    month_key = f"{publish_date.year}-{publish_date.month:02d}"
-                    monthly_count[month_key] += 1
-                except Exception:
-                    pass
-        
         # 获取最近N个月的数据
-        sorted_months = sorted(monthly_count.items(), key=lambda x: x[0], reverse=True)[:months]
+        groups = self._get_date_index()['groups'][:months]
         
         return [
             {
-                'month': month,
-                'count': count,
-                'year': int(month.split('-')[0]),
-                'month_num': int(month.split('-')[1])
+                'month': f"{group['year']}-{group['month']:02d}",
+                'count': group['count'],
+                'year': group['year'],
+                'month_num': group['month']
             }
-            for month, count in sorted_months
+            for group in groups
         ]
     
     def get_content_analysis(self) -> Dict:
         """获取内容分析统计"""
-        self.process_posts_metadata()
+        snapshot = self.process_posts_metadata()
         
         analysis = {
             'avg_title_length': 0,
@@ -382,40 +800,17 @@ class BlogDataManager:
             }
         }
         
-        if not self.posts:
+        columns = self._get_columns(snapshot)
+        post_count = len(columns)
+        if not post_count:
             return analysis
         
-        total_title_len = 0
-        total_content_len = 0
-        total_keywords = 0
-        
-        for post in self.posts:
-            title_len = len(post.get('title', ''))
-            content_len = len(post.get('content', ''))
-            keywords_count = len(post.get('keywords', []))
-            
-            total_title_len += title_len
-            total_content_len += content_len
-            total_keywords += keywords_count
-            
-            # 内容长度分布
-            if content_len < 200:
-                analysis['length_distribution']['very_short'] += 1
-            elif content_len < 500:
-                analysis['length_distribution']['short'] += 1
-            elif content_len < 1500:
-                analysis['length_distribution']['medium'] += 1
-            elif content_len < 3000:
-                analysis['length_distribution']['long'] += 1
-            else:
-                analysis['length_distribution']['very_long'] += 1
-        
-        post_count = len(self.posts)
-        analysis['avg_title_length'] = round(total_title_len / post_count, 1)
-        analysis['avg_content_length'] = round(total_content_len / post_count, 1)
-        analysis['avg_keywords_count'] = round(total_keywords / post_count, 1)
+        analysis['avg_title_length'] = round(sum(columns.title_lengths) / post_count, 1)
+        analysis['avg_content_length'] = round(sum(columns.content_lengths) / post_count, 1)
+        analysis['avg_keywords_count'] = round(sum(columns.keyword_counts) / post_count, 1)
+        analysis['length_distribution'] = columns.length_distribution()
         
         return analysis
 
-# 全局数据管理器实例
-data_manager = BlogDataManager()
\ No newline at end of file
+# 全局数据管理器实例（数据文件可通过 BLOG_DATA_FILE 环境变量指定）
+data_manager = BlogDataManager(os.environ.get('BLOG_DATA_FILE', 'blog_data.json'))
@@ -0,0 +1,315 @@
+"""分布式爬取：多个 worker 进程共享一个 SQLite 任务队列
+
+worker 从队列领取URL租约（带可见性超时），抓取解析后把文章和新发现的URL
+写回同一数据库；coordinator 定期把结果合并进 BlogDataManager。
+worker 崩溃后其租约到期会被其他 worker 重新领取，不会丢失任务。
+
+用法:
+    python distributed_crawler.py coordinator --workers 4
+    python distributed_crawler.py worker --db crawl_queue.db      # 在其他节点上追加 worker
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional
+
+from crawler import FastBlogCrawler, logger
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    enqueued_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_state ON urls (state, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    posts TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    merged INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_merged ON results (merged, id);
+'''
+
+
+class CrawlQueue:
+    """基于 SQLite 的URL任务队列
+
+    状态流转：pending -> leased -> done / failed。领取时把租约过期的 leased
+    任务视同 pending，因此崩溃 worker 的任务会在 visibility_timeout 秒后自动回收。
+    每个进程（线程）应使用自己的 CrawlQueue 实例。
+    """
+
+    def __init__(self, db_path: str = 'crawl_queue.db', visibility_timeout: float = 120,
+                 max_attempts: int = 3):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE 立即取得写锁，避免多个 worker 领取到同一任务
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """加入新URL（已存在的忽略），返回新增数量"""
+        now = time.time()
+        conn = self._transaction()
+        try:
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO urls (url, enqueued_at) VALUES (?, ?)',
+                             ((url, now) for url in urls))
+            added = conn.total_changes - before
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return added
+
+    def claim(self, worker_id: str, limit: int = 10) -> List[str]:
+        """领取最多 limit 个待处理或租约已过期的URL
+
+        租约过期且已领取 max_attempts 次的URL标记为 failed：这类URL往往会让 worker
+        进程崩溃（抓取或解析时被杀死），不再反复分发。
+        """
+        now = time.time()
+        conn = self._transaction()
+        try:
+            conn.execute(
+                "UPDATE urls SET state = 'failed', lease_owner = NULL, lease_expires = NULL "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts))
+            rows = conn.execute(
+                "SELECT url FROM urls WHERE state = 'pending' "
+                "OR (state = 'leased' AND lease_expires < ?) ORDER BY enqueued_at LIMIT ?",
+                (now, limit)).fetchall()
+            urls = [row[0] for row in rows]
+            conn.executemany(
+                "UPDATE urls SET state = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE url = ?",
+                ((worker_id, now + self.visibility_timeout, url) for url in urls))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return urls
+
+    def complete(self, url: str, worker_id: str, posts: List[Dict], discovered: Iterable[str] = ()) -> bool:
+        """提交抓取结果：写入文章、加入新发现的URL并结束租约（同一事务）
+
+        租约已被其他 worker 收回时放弃本次结果，返回 False。
+        """
+        now = time.time()
+        conn = self._transaction()
+        try:
+            updated = conn.execute(
+                "UPDATE urls SET state = 'done', lease_owner = NULL, lease_expires = NULL "
+                "WHERE url = ? AND state = 'leased' AND lease_owner = ?", (url, worker_id)).rowcount
+            if updated:
+                if posts:
+                    conn.execute(
+                        'INSERT INTO results (url, worker, posts, created_at) VALUES (?, ?, ?, ?)',
+                        (url, worker_id, json.dumps(posts, ensure_ascii=False, default=str), now))
+                conn.executemany('INSERT OR IGNORE INTO urls (url, enqueued_at) VALUES (?, ?)',
+                                 ((new_url, now) for new_url in discovered))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return bool(updated)
+
+    def fail(self, url: str, worker_id: str):
+        """抓取失败：未超过重试次数时放回队列，否则标记为 failed"""
+        self.conn.execute(
+            "UPDATE urls SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_owner = NULL, lease_expires = NULL "
+            "WHERE url = ? AND state = 'leased' AND lease_owner = ?",
+            (self.max_attempts, url, worker_id))
+
+    def pending_results(self, limit: int = 500) -> List[tuple]:
+        """未合并的结果 [(id, posts)]"""
+        rows = self.conn.execute(
+            'SELECT id, posts FROM results WHERE merged = 0 ORDER BY id LIMIT ?', (limit,)).fetchall()
+        return [(row_id, json.loads(posts)) for row_id, posts in rows]
+
+    def mark_merged(self, result_ids: List[int]):
+        self.conn.executemany('UPDATE results SET merged = 1 WHERE id = ?', ((i,) for i in result_ids))
+
+    def is_drained(self) -> bool:
+        """没有待处理和处理中的URL"""
+        row = self.conn.execute(
+            "SELECT 1 FROM urls WHERE state IN ('pending', 'leased') LIMIT 1").fetchone()
+        return row is None
+
+    def stats(self) -> Dict[str, int]:
+        stats = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for state, count in self.conn.execute('SELECT state, COUNT(*) FROM urls GROUP BY state'):
+            stats[state] = count
+        stats['unmerged_results'] = self.conn.execute(
+            'SELECT COUNT(*) FROM results WHERE merged = 0').fetchone()[0]
+        return stats
+
+
+def run_worker(db_path: str, base_url: str, worker_id: Optional[str] = None, batch_size: int = 10,
+               threads: int = 4, visibility_timeout: float = 120, idle_timeout: float = 10,
+               poll_interval: float = 0.5, delay: bool = True) -> int:
+    """worker 主循环：领取 -> 并发抓取解析 -> 提交结果，队列清空 idle_timeout 秒后退出
+
+    返回本 worker 处理的URL数。
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    queue = CrawlQueue(db_path, visibility_timeout)
+    # worker 不加载爬取缓存和数据文件：去重由队列和合并时的URL索引负责
+    crawler = FastBlogCrawler(base_url, threads, use_cache=False)
+    logger.info(f"worker {worker_id} 启动，队列: {db_path}")
+
+    def fetch(url):
+        html_content = crawler.get_page_content(url)
+        if not html_content:
+            return None
+        posts = crawler.parse_blog_posts(html_content, url)
+        discovered = (crawler.discover_pagination_urls(html_content, url)
+                      | crawler.discover_archive_urls(html_content, url))
+        if delay:
+            time.sleep(crawler.get_random_delay())
+        return posts, discovered
+
+    processed = 0
+    idle_since = None
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        while True:
+            urls = queue.claim(worker_id, batch_size)
+            if not urls:
+                # 其他 worker 仍持有租约时可能还会发现新URL，继续等待
+                if not queue.is_drained():
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = time.time()
+                elif time.time() - idle_since >= idle_timeout:
+                    break
+                time.sleep(poll_interval)
+                continue
+            idle_since = None
+
+            # 数据库写入都在主线程完成，抓取线程只做网络和解析
+            future_to_url = {executor.submit(fetch, url): url for url in urls}
+            for future in as_completed(future_to_url):
+                url = future_to_url[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"worker {worker_id} 抓取失败 {url}: {e}")
+                    result = None
+                if result is None:
+                    queue.fail(url, worker_id)
+                    continue
+                posts, discovered = result
+                if queue.complete(url, worker_id, posts, discovered):
+                    processed += 1
+                else:
+                    logger.warning(f"worker {worker_id} 租约已失效，放弃结果: {url}")
+
+    logger.info(f"worker {worker_id} 退出，处理URL {processed} 个")
+    queue.close()
+    return processed
+
+
+def merge_results(queue: CrawlQueue, manager, batch_size: int = 500) -> int:
+    """把未合并的结果并入数据管理器（按URL去重），返回新增文章数"""
+    added = 0
+    while True:
+        rows = queue.pending_results(batch_size)
+        if not rows:
+            break
+        posts = [post for _, batch in rows for post in batch]
+        added += manager.add_posts_batch(posts)
+        queue.mark_merged([row_id for row_id, _ in rows])
+    return added
+
+
+def run_coordinator(db_path: str, base_url: str, workers: int = 4, merge_interval: float = 2.0,
+                    worker_args: Optional[List[str]] = None, manager=None) -> Dict[str, int]:
+    """启动本地 worker 子进程、投放种子URL，并周期性合并结果直到所有 worker 退出"""
+    if manager is None:
+        from data_manager import data_manager as manager
+
+    queue = CrawlQueue(db_path)
+    seeds = FastBlogCrawler.seed_urls(base_url)
+    logger.info(f"投放种子URL {queue.enqueue(seeds)} 个")
+
+    command = [sys.executable, os.path.abspath(__file__), 'worker', '--db', db_path,
+               '--base-url', base_url] + (worker_args or [])
+    processes = [subprocess.Popen(command) for _ in range(workers)]
+
+    added = 0
+    try:
+        while any(process.poll() is None for process in processes):
+            time.sleep(merge_interval)
+            merged = merge_results(queue, manager)
+            if merged:
+                manager.save_data()
+                added += merged
+                logger.info(f"合并新文章 {merged} 篇，队列状态: {queue.stats()}")
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+
+    merged = merge_results(queue, manager)
+    if merged:
+        manager.save_data()
+        added += merged
+    stats = queue.stats()
+    stats['added'] = added
+    logger.info(f"分布式爬取完成: {stats}")
+    queue.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分布式博客爬虫')
+    parser.add_argument('role', choices=['coordinator', 'worker'])
+    parser.add_argument('--db', default='crawl_queue.db', help='共享队列数据库路径')
+    parser.add_argument('--base-url', default='https://hwv430.blogspot.com')
+    parser.add_argument('--workers', type=int, default=4, help='coordinator 启动的本地 worker 数')
+    parser.add_argument('--threads', type=int, default=4, help='每个 worker 的抓取线程数')
+    parser.add_argument('--batch-size', type=int, default=10, help='每次领取的URL数')
+    parser.add_argument('--visibility-timeout', type=float, default=120, help='租约超时（秒）')
+    parser.add_argument('--idle-timeout', type=float, default=10, help='队列清空后 worker 的等待时间（秒）')
+    parser.add_argument('--no-delay', action='store_true', help='关闭请求间的随机延迟')
+    args = parser.parse_args()
+
+    if args.role == 'worker':
+        run_worker(args.db, args.base_url, batch_size=args.batch_size, threads=args.threads,
+                   visibility_timeout=args.visibility_timeout, idle_timeout=args.idle_timeout,
+                   delay=not args.no_delay)
+    else:
+        worker_args = ['--threads', str(args.threads), '--batch-size', str(args.batch_size),
+                       '--visibility-timeout', str(args.visibility_timeout),
+                       '--idle-timeout', str(args.idle_timeout)]
+        if args.no_delay:
+            worker_args.append('--no-delay')
+        run_coordinator(args.db, args.base_url, args.workers, worker_args=worker_args)
+
+
+if __name__ == '__main__':
+    main()
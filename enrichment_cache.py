@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def make_key(*parts) -> str:
+    """缓存键：各部分（富化类型、分词器版本、参数、清洗后的文本）拼接后的 SHA-1"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _encode(value: Dict) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def _decode(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+class EnrichmentCache:
+    """富化结果（语言、关键词等）缓存接口
+
+    本类本身不缓存任何内容，用于关闭缓存；子类实现 _get/_put。
+    值为可 JSON 序列化的字典。
+    """
+    backend = 'off'
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict):
+        self._put(key, value)
+
+    def _get(self, key: str) -> Optional[Dict]:
+        return None
+
+    def _put(self, key: str, value: Dict):
+        pass
+
+    def flush(self):
+        """提交未写入的结果并按容量淘汰"""
+
+    def close(self):
+        self.flush()
+
+    def __len__(self) -> int:
+        return 0
+
+    def size_bytes(self) -> int:
+        return 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'entries': len(self),
+            'bytes': self.size_bytes(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+        }
+
+
+class MemoryEnrichmentCache(EnrichmentCache):
+    """进程内 LRU 缓存，按压缩后的总字节数限制容量"""
+    backend = 'memory'
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is None:
+                return None
+            self._entries.move_to_end(key)
+        return _decode(blob)
+
+    def _put(self, key: str, value: Dict):
+        blob = _encode(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = blob
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+class SQLiteEnrichmentCache(EnrichmentCache):
+    """基于 SQLite 的持久化 LRU 缓存，可由爬虫、Web 应用等多个进程共享
+
+    连接使用自动提交模式，读取不开启事务。写入和访问时间的更新先在内存中积攒，
+    每 batch_size 条或调用 flush() 时在一个短事务中一并提交，事务不会跨越两次调用，
+    其他进程最多等待一个批次的写入；提交时若总字节数超过 max_bytes，
+    按最近访问时间淘汰最旧的条目，直到降至 90%。访问时间按批更新，因此淘汰顺序是近似 LRU。
+    条目数和总字节数记录在 meta 表中，随每次写入在同一事务内增减（多进程共享时同样准确），
+    提交和统计的代价与缓存大小无关。
+    """
+    backend = 'sqlite'
+
+    def __init__(self, path: str = 'enrichment_cache.db', max_bytes: int = 64 * 1024 * 1024,
+                 batch_size: int = 50):
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        # 尚未提交的写入：键 -> 压缩后的值
+        self._pending: Dict[str, bytes] = {}
+        self._touched: Dict[str, float] = {}
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        self._init_totals()
+
+    def _init_totals(self):
+        """meta 表中没有计数时（新建或旧版本的缓存文件）扫描一次全表"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            if self.conn.execute("SELECT 1 FROM meta WHERE name = 'bytes'").fetchone() is None:
+                entries, size = self.conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+                self.conn.executemany('INSERT INTO meta (name, value) VALUES (?, ?)',
+                                      (('entries', entries), ('bytes', size)))
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def _totals(self) -> Dict[str, int]:
+        """meta 表中的计数：{'entries': 条目数, 'bytes': 总字节数}"""
+        return dict(self.conn.execute('SELECT name, value FROM meta'))
+
+    def _adjust_totals(self, entries: int, size: int):
+        if entries or size:
+            self.conn.executemany('UPDATE meta SET value = value + ? WHERE name = ?',
+                                  ((entries, 'entries'), (size, 'bytes')))
+
+    def _get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            blob = self._pending.get(key)
+            if blob is None:
+                try:
+                    row = self.conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+                except sqlite3.Error as e:
+                    print(f"读取富化缓存失败: {e}")
+                    return None
+                if row is None:
+                    return None
+                blob = row[0]
+                self._touched[key] = time.time()
+                if len(self._touched) >= self.batch_size:
+                    self._flush_locked()
+        return _decode(blob)
+
+    def _put(self, key: str, value: Dict):
+        blob = _encode(value)
+        with self._lock:
+            self._pending[key] = blob
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending and not self._touched:
+            return
+        now = time.time()
+        try:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                if self._touched:
+                    self.conn.executemany('UPDATE entries SET accessed = ? WHERE key = ?',
+                                          ((accessed, key) for key, accessed in self._touched.items()))
+                evicted = 0
+                if self._pending:
+                    # 被替换的旧条目的大小，用于维护总数
+                    keys = list(self._pending)
+                    replaced = {}
+                    for i in range(0, len(keys), 500):
+                        chunk = keys[i:i + 500]
+                        replaced.update(self.conn.execute(
+                            f"SELECT key, size FROM entries WHERE key IN ({','.join('?' * len(chunk))})",
+                            chunk).fetchall())
+                    self._adjust_totals(len(keys) - len(replaced),
+                                        sum(len(blob) for blob in self._pending.values()) - sum(replaced.values()))
+                    self.conn.executemany(
+                        'INSERT OR REPLACE INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?)',
+                        ((key, blob, len(blob), now) for key, blob in self._pending.items()))
+                    evicted = self._evict_locked()
+                self.conn.execute('COMMIT')
+                self.evictions += evicted
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            # 缓存只是加速手段：提交失败（例如长时间被锁）时丢弃本批结果
+            print(f"提交富化缓存失败: {e}")
+        self._touched = {}
+        self._pending = {}
+
+    def _evict_locked(self) -> int:
+        """超出容量时删除最久未访问的条目，返回删除条数"""
+        total = self._totals()['bytes']
+        if total <= self.max_bytes:
+            return 0
+        target = total - int(self.max_bytes * 0.9)
+        keys = []
+        freed = 0
+        for key, size in self.conn.execute('SELECT key, size FROM entries ORDER BY accessed'):
+            keys.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self.conn.executemany('DELETE FROM entries WHERE key = ?', keys)
+        self._adjust_totals(-len(keys), -freed)
+        return len(keys)
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self.conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._flush_locked()
+            return self._totals()['entries']
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            self._flush_locked()
+            return self._totals()['bytes']
+
+
+def open_enrichment_cache(spec: Optional[str], default_path: str) -> EnrichmentCache:
+    """按配置创建缓存：'off' 或空串关闭，'memory' 为进程内缓存，其余视为 SQLite 文件路径
+
+    spec 为 None 时使用 default_path。容量可用环境变量 ENRICHMENT_CACHE_MAX_MB 设置（默认 64）。
+    """
+    max_bytes = int(float(os.environ.get('ENRICHMENT_CACHE_MAX_MB', 64)) * 1024 * 1024)
+    if spec is None:
+        spec = default_path
+    if spec in ('', 'off'):
+        return EnrichmentCache()
+    if spec == 'memory':
+        return MemoryEnrichmentCache(max_bytes)
+    try:
+        return SQLiteEnrichmentCache(spec, max_bytes)
+    except sqlite3.Error as e:
+        print(f"打开富化缓存失败，已关闭缓存: {e}")
+        return EnrichmentCache()
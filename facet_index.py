@@ -0,0 +1,200 @@
+import heapq
+from array import array
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from post_store import LENGTH_BUCKETS, PostColumns
+
+# 支持的分面：语言、发布年份、发布年月、内容长度分档、关键词
+FACETS = ('language', 'year', 'month', 'length', 'keyword')
+
+# 每个字节中为 1 的位
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def _popcount(bitmap: int) -> int:
+    return bin(bitmap).count('1')
+
+
+# Python 3.10+ 使用 int.bit_count
+popcount = getattr(int, 'bit_count', _popcount)
+
+
+def bitmap_from_positions(positions: Iterable[int], size: int) -> int:
+    """位置列表 -> 位图（第 i 位对应列下标 i）"""
+    buffer = bytearray((size + 7) // 8)
+    for i in positions:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def bitmap_positions(bitmap: int) -> List[int]:
+    """位图 -> 升序的位置列表，按字节扫描，代价 O(n/8 + k)"""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    positions = []
+    for byte_index, byte in enumerate(data):
+        if byte:
+            base = byte_index << 3
+            positions.extend(base + bit for bit in _BYTE_BITS[byte])
+    return positions
+
+
+class FacetIndex:
+    """分面位图索引
+
+    每个分面取值对应一个文章集合，下标与 PostColumns 一致。集合按密度选择存储方式：
+    稠密集合用 Python int 位图，稀疏集合（例如大多数关键词）用有序下标 array，
+    避免为上万个关键词各存一份 n 位的位图。
+    筛选时同一分面内多个取值取并集、不同分面取交集（位与）；分面计数在位图上做 popcount，
+    稀疏集合逐个检查下标是否在结果位图中。结果集很小时直接遍历结果中的文章计数。
+    """
+
+    def __init__(self, columns: PostColumns):
+        self.columns = columns
+        self.size = size = len(columns)
+        self.all = (1 << size) - 1
+        # 分面 -> 每篇文章的取值（关键词为元组），用于小结果集的直接计数
+        self.values: Dict[str, list] = {}
+        self.sets: Dict[str, Dict[str, object]] = {}
+        self.totals: Dict[str, Dict[str, int]] = {}
+        self._set_cost: Dict[str, int] = {}
+        self._values_per_post: Dict[str, float] = {}
+
+        languages = [columns.languages[code] for code in columns.language_codes]
+        years = [None] * size
+        months = [None] * size
+        date_cache = {}
+        for i, ordinal in enumerate(columns.date_ordinals):
+            if not ordinal:
+                continue
+            year_month = date_cache.get(ordinal)
+            if year_month is None:
+                day = date.fromordinal(ordinal)
+                year_month = date_cache[ordinal] = (str(day.year), f"{day.year}-{day.month:02d}")
+            years[i], months[i] = year_month
+        lengths = [self.length_bucket(length) for length in columns.content_lengths]
+        keywords = [tuple(dict.fromkeys(post.get('keywords') or ())) for post in columns.posts]
+
+        for facet, values in (('language', languages), ('year', years), ('month', months),
+                              ('length', lengths), ('keyword', keywords)):
+            self.values[facet] = values
+            self._build(facet, values, multi=facet == 'keyword')
+
+    @staticmethod
+    def length_bucket(length: int) -> str:
+        for name, low, high in LENGTH_BUCKETS:
+            if length >= low and (high is None or length < high):
+                return name
+        return LENGTH_BUCKETS[-1][0]
+
+    def _build(self, facet: str, values: Sequence, multi: bool = False):
+        positions: Dict[str, list] = {}
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            for item in (value if multi else (value,)):
+                positions.setdefault(item, []).append(i)
+
+        # 下标数组每项 8 字节，位图共 n/8 字节：超过 n/64 项时位图更省
+        dense_threshold = self.size // 64
+        sets = {}
+        for value, members in positions.items():
+            if len(members) > dense_threshold:
+                sets[value] = bitmap_from_positions(members, self.size)
+            else:
+                sets[value] = array('l', members)
+        self.sets[facet] = sets
+        self.totals[facet] = {value: len(members) for value, members in positions.items()}
+        # 逐集合计数的代价：稀疏集合的下标总数 + 位图个数（popcount 在 C 中完成，按一次计）
+        self._set_cost[facet] = sum(len(members) for members in sets.values() if not isinstance(members, int)) \
+            + sum(1 for members in sets.values() if isinstance(members, int))
+        self._values_per_post[facet] = sum(self.totals[facet].values()) / self.size if self.size else 0
+
+    def _as_bitmap(self, members) -> int:
+        if isinstance(members, int):
+            return members
+        return bitmap_from_positions(members, self.size)
+
+    def filter_bitmap(self, facet: str, selected: Iterable[str]) -> int:
+        """同一分面内选中取值的并集，未知取值视为空集"""
+        sets = self.sets[facet]
+        bitmap = 0
+        for value in selected:
+            members = sets.get(value)
+            if members is not None:
+                bitmap |= self._as_bitmap(members)
+        return bitmap
+
+    def match(self, filters: Optional[Dict[str, List[str]]] = None, base: Optional[int] = None) -> int:
+        """base（默认全部文章）与各分面筛选条件的交集"""
+        result = self.all if base is None else base
+        for facet, selected in (filters or {}).items():
+            if selected:
+                result &= self.filter_bitmap(facet, selected)
+        return result
+
+    def counts(self, facet: str, bitmap: int) -> Dict[str, int]:
+        """结果位图中各取值的文章数"""
+        if bitmap == self.all:
+            return dict(self.totals[facet])
+        sets = self.sets[facet]
+        if popcount(bitmap) * self._values_per_post[facet] <= self._set_cost[facet]:
+            # 结果集足够小：直接遍历结果中的文章比逐集合计数更快
+            counts: Dict[str, int] = {}
+            values = self.values[facet]
+            multi = facet == 'keyword'
+            for i in bitmap_positions(bitmap):
+                value = values[i]
+                if value is None:
+                    continue
+                for item in (value if multi else (value,)):
+                    counts[item] = counts.get(item, 0) + 1
+            return counts
+
+        data = None
+        counts = {}
+        for value, members in sets.items():
+            if isinstance(members, int):
+                count = popcount(bitmap & members)
+            else:
+                if data is None:
+                    data = bitmap.to_bytes((self.size + 7) // 8, 'little')
+                count = 0
+                for i in members:
+                    count += data[i >> 3] >> (i & 7) & 1
+            if count:
+                counts[value] = count
+        return counts
+
+    def facet_counts(self, base: int, filters: Optional[Dict[str, List[str]]] = None,
+                     limit: int = 20) -> Dict[str, List[Dict]]:
+        """各分面的取值计数
+
+        某分面的计数不受该分面自身筛选条件的影响（其余条件仍然生效），
+        这样选中一个语言后仍能看到其他语言各有多少结果。
+        """
+        filters = filters or {}
+        filter_bitmaps = {facet: self.filter_bitmap(facet, selected)
+                          for facet, selected in filters.items() if selected}
+        result = {}
+        for facet in FACETS:
+            bitmap = base
+            for other, other_bitmap in filter_bitmaps.items():
+                if other != facet:
+                    bitmap &= other_bitmap
+            counts = self.counts(facet, bitmap)
+            selected = set(filters.get(facet) or ())
+            if facet in ('year', 'month'):
+                top = sorted(counts.items(), reverse=True)[:limit]
+            elif facet == 'length':
+                top = [(name, counts[name]) for name, _, _ in LENGTH_BUCKETS if name in counts]
+            else:
+                top = heapq.nlargest(limit, counts.items(), key=lambda item: (item[1], item[0]))
+            # 已选中的取值即使不在前 limit 个中也要返回
+            shown = {value for value, _ in top}
+            top.extend((value, counts.get(value, 0)) for value in sorted(selected - shown))
+            result[facet] = [
+                {'value': value, 'count': count, 'selected': value in selected}
+                for value, count in top
+            ]
+        return result
@@ -0,0 +1,308 @@
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 默认延迟分桶（秒）
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 响应体大小分桶（字节）
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# BlogDataManager 中需要统计耗时的方法（嵌套调用时各自计入，即包含子调用耗时）
+DATA_MANAGER_METHODS = (
+    'load_data', 'save_data', 'add_posts_batch', 'update_posts_batch', 'process_posts_metadata',
+    'get_filtered_posts', 'get_all_posts', 'search_posts', 'get_suggestions', 'get_post_by_id',
+    'get_date_groups', 'get_posts_by_date', 'get_stats', 'get_language_distribution',
+    'get_monthly_trend', 'get_content_analysis', 'detect_language', 'extract_keywords',
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricCounter:
+    """Prometheus counter"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}')
+        return lines
+
+
+class Histogram:
+    """Prometheus histogram（固定分桶，按标签值分组）"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # 标签值 -> [各分桶计数..., 总和]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = 0
+        buckets = self.buckets
+        while value > buckets[index]:
+            index += 1
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(buckets) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = 'le="' + _format_number(bound) + '"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_number(values[-1])}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表，输出 Prometheus 文本格式"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricCounter:
+        metric = MetricCounter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+request_latency = registry.histogram(
+    'moyun_request_duration_seconds', '按路由统计的请求耗时', ('endpoint', 'method'))
+request_count = registry.counter(
+    'moyun_requests_total', '按路由和状态码统计的请求数', ('endpoint', 'status'))
+response_size = registry.histogram(
+    'moyun_response_size_bytes', '响应体大小', ('endpoint',), SIZE_BUCKETS)
+data_manager_latency = registry.histogram(
+    'moyun_data_manager_seconds', 'BlogDataManager 方法耗时（含嵌套调用）', ('method',))
+template_latency = registry.histogram(
+    'moyun_template_render_seconds', 'Jinja 模板渲染耗时', ('template',))
+lock_wait = registry.histogram(
+    'moyun_lock_wait_seconds', '获取 BlogDataManager 锁的等待时间', ('lock',))
+slow_requests = registry.counter(
+    'moyun_slow_requests_total', '超过慢请求阈值的请求数', ('endpoint',))
+
+
+class TimedLock:
+    """记录等待时间的锁代理，接口与 threading.Lock 相同"""
+
+    def __init__(self, lock, name: str):
+        self._lock = lock
+        self._name = name
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        start = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            lock_wait.observe(time.perf_counter() - start, self._name)
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class StackSampler(threading.Thread):
+    """请求期间定时采样目标线程的调用栈，用于慢请求分析"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005, max_depth: int = 15):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            # 只保留最内层的 max_depth 帧
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+def instrument_data_manager(manager, methods: Sequence[str] = DATA_MANAGER_METHODS):
+    """为数据管理器实例的方法和锁加上计时"""
+    for name in methods:
+        method = getattr(manager, name, None)
+        if method is None or getattr(method, '_instrumented', False):
+            continue
+        setattr(manager, name, _timed(method, name))
+    for attr, label in (('lock', 'write'), ('_save_lock', 'save')):
+        lock = getattr(manager, attr, None)
+        if lock is not None and not isinstance(lock, TimedLock):
+            setattr(manager, attr, TimedLock(lock, label))
+
+
+def _timed(method, name: str):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            data_manager_latency.observe(time.perf_counter() - start, name)
+    wrapper._instrumented = True
+    return wrapper
+
+
+def init_app(app, manager=None):
+    """注册请求计时、模板渲染计时和慢请求日志
+
+    配置项（可通过同名环境变量设置）：
+    SLOW_REQUEST_MS            慢请求阈值，默认 500 毫秒
+    PROFILE_SAMPLE_RATE        慢请求栈采样比例（0~1），默认 0 即关闭
+    """
+    from flask import g, request, before_render_template, template_rendered
+
+    app.config.setdefault('SLOW_REQUEST_MS', float(os.environ.get('SLOW_REQUEST_MS', 500)))
+    app.config.setdefault('PROFILE_SAMPLE_RATE', float(os.environ.get('PROFILE_SAMPLE_RATE', 0)))
+
+    if manager is not None:
+        instrument_data_manager(manager)
+
+    def endpoint_label() -> str:
+        rule = request.url_rule
+        return rule.rule if rule is not None else 'unmatched'
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_templates = []
+        sample_rate = app.config['PROFILE_SAMPLE_RATE']
+        if sample_rate and random.random() < sample_rate:
+            g.metrics_sampler = StackSampler(threading.get_ident())
+            g.metrics_sampler.start()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        endpoint = endpoint_label()
+        request_latency.observe(elapsed, endpoint, request.method)
+        request_count.inc(endpoint, str(response.status_code))
+        if not response.is_streamed:
+            response_size.observe(response.calculate_content_length() or 0, endpoint)
+
+        sampler = g.pop('metrics_sampler', None)
+        stacks = sampler.stop() if sampler is not None else None
+        if elapsed * 1000 >= app.config['SLOW_REQUEST_MS']:
+            slow_requests.inc(endpoint)
+            _log_slow_request(request.full_path, elapsed, stacks)
+        return response
+
+    @app.teardown_request
+    def record_failure(error):
+        # after_request 未执行（未捕获异常）时仍记录一次 500
+        start = g.pop('metrics_start', None)
+        sampler = g.pop('metrics_sampler', None)
+        if sampler is not None:
+            sampler.stop()
+        if start is not None and error is not None:
+            endpoint = endpoint_label()
+            request_latency.observe(time.perf_counter() - start, endpoint, request.method)
+            request_count.inc(endpoint, '500')
+
+    def template_started(sender, template, context, **extra):
+        g.setdefault('metrics_templates', []).append(time.perf_counter())
+
+    def template_finished(sender, template, context, **extra):
+        starts = g.get('metrics_templates')
+        if starts:
+            template_latency.observe(time.perf_counter() - starts.pop(), template.name or 'string')
+
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
+
+
+def _log_slow_request(path: str, elapsed: float, stacks: Optional[Counter], top: int = 5):
+    logger.warning(f"慢请求: {path} 耗时 {elapsed * 1000:.1f}ms")
+    if stacks:
+        total = sum(stacks.values())
+        for stack, count in stacks.most_common(top):
+            logger.warning(f"  [{count}/{total}] {stack}")
@@ -0,0 +1,319 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+# 时间戳字段以整数微秒存储，序列化时还原为 ISO 字符串
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# 与 get_content_analysis 一致的内容长度分档
+LENGTH_BUCKETS = (
+    ('very_short', 0, 200),
+    ('short', 200, 500),
+    ('medium', 500, 1500),
+    ('long', 1500, 3000),
+    ('very_long', 3000, None),
+)
+
+
+def _parse_iso(text: str) -> datetime:
+    """解析 ISO 时间字符串；带时区的时间换算为服务器本地时间后去掉时区信息（与 datetime.now() 写入的时间一致）"""
+    if text.endswith(('Z', 'z')):
+        # Python 3.11 之前的 fromisoformat 不接受 Z 后缀
+        text = text[:-1] + '+00:00'
+    value = datetime.fromisoformat(text)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def _pack_timestamp(value):
+    """ISO 字符串 -> 整数微秒
+
+    只有还原后与原字符串完全一致（无时区、isoformat 的标准写法）时才转换，
+    其余字符串（带时区、只有日期、毫秒精度、无法解析等）原样保留，保证保存时不改写数据。
+    """
+    if isinstance(value, str):
+        try:
+            packed = (datetime.fromisoformat(value) - _EPOCH) // _MICROSECOND
+        except (TypeError, ValueError):
+            return value
+        if _unpack_timestamp(packed) == value:
+            return packed
+    return value
+
+
+def _unpack_timestamp(value):
+    if isinstance(value, int):
+        return (_EPOCH + value * _MICROSECOND).isoformat()
+    return value
+
+
+def timestamp_from_iso(text: str) -> int:
+    """ISO 时间字符串 -> 整数微秒（与 Post 内部存储一致，带时区时按 UTC），格式错误时抛出 ValueError"""
+    if not isinstance(text, str):
+        raise ValueError(f"无效的时间: {text!r}")
+    return (_parse_iso(text) - _EPOCH) // _MICROSECOND
+
+
+def _timestamp_property(slot: str):
+    def getter(self):
+        return _unpack_timestamp(getattr(self, slot))
+
+    def setter(self, value):
+        setattr(self, slot, _pack_timestamp(value))
+
+    def deleter(self):
+        delattr(self, slot)
+
+    return property(getter, setter, deleter)
+
+
+class Post:
+    """紧凑的文章记录
+
+    使用 __slots__ 代替 dict，同时保留 get/[]/in/keys 等字典式接口，
+    模板、爬虫和 JSON 序列化代码无需区分两者。未知字段存放在 extra 中。
+    """
+    FIELDS = ('title', 'url', 'content', 'summary', 'publish_date', 'source_page', 'crawl_time',
+              'id', 'created_at', 'updated_at', 'language', 'keywords', 'popularity_score')
+
+    __slots__ = ('title', 'url', 'content', 'summary', 'publish_date', 'source_page', '_crawl_time',
+                 'id', '_created_at', '_updated_at', 'language', 'keywords', 'popularity_score', 'extra')
+
+    created_at = _timestamp_property('_created_at')
+    updated_at = _timestamp_property('_updated_at')
+    crawl_time = _timestamp_property('_crawl_time')
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Post':
+        post = cls(**data)
+        publish_date = post.get('publish_date')
+        if isinstance(publish_date, str):
+            try:
+                post.publish_date = datetime.fromisoformat(publish_date).date()
+            except ValueError:
+                pass
+        return post
+
+    def to_dict(self) -> Dict:
+        """字典视图（用于 JSON 和持久化）"""
+        return dict(self.items())
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        extra = getattr(self, 'extra', None)
+        if extra is None:
+            raise KeyError(key)
+        return extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            extra = getattr(self, 'extra', None)
+            if extra is None:
+                extra = self.extra = {}
+            extra[key] = value
+
+    def __delitem__(self, key):
+        try:
+            if key in self.FIELDS:
+                delattr(self, key)
+            else:
+                del self.extra[key]
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __repr__(self) -> str:
+        return f"Post(id={self.get('id')!r}, title={self.get('title')!r})"
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        keys = [key for key in self.FIELDS if key in self]
+        extra = getattr(self, 'extra', None)
+        if extra:
+            keys.extend(extra)
+        return keys
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def modified_at(self) -> Optional[int]:
+        """最后修改时间（微秒），取 created_at 与 updated_at 中较晚者"""
+        values = []
+        for slot in ('_created_at', '_updated_at'):
+            value = getattr(self, slot, None)
+            if isinstance(value, str):
+                # 非标准写法的时间按字符串保存，比较时再解析
+                try:
+                    value = timestamp_from_iso(value)
+                except ValueError:
+                    continue
+            if isinstance(value, int):
+                values.append(value)
+        return max(values) if values else None
+
+    def copy(self) -> 'Post':
+        """逐个槽位浅复制（用于写时复制）"""
+        clone = Post.__new__(Post)
+        for slot in self.__slots__:
+            try:
+                setattr(clone, slot, getattr(self, slot))
+            except AttributeError:
+                pass
+        if getattr(self, 'extra', None):
+            clone.extra = dict(self.extra)
+        return clone
+
+
+class PostColumns:
+    """文章的列式视图
+
+    每个字段一列 array，下标与 posts 一一对应。统计和排序在列上批量完成，
+    构建后不再修改；数据或热度变化时由 BlogDataManager 重新构建。
+    """
+
+    def __init__(self, posts: Sequence[Post]):
+        self.posts = tuple(posts)
+        count = len(self.posts)
+        self.ids = array('q', [0]) * count
+        self.date_ordinals = array('l', [0]) * count  # 0 表示无发布日期
+        self.title_lengths = array('l', [0]) * count
+        self.content_lengths = array('l', [0]) * count
+        self.keyword_counts = array('l', [0]) * count
+        self.language_codes = array('B', [0]) * count
+        self.scores = array('d', [0.0]) * count
+        self.languages: List[str] = []
+        language_lookup: Dict[str, int] = {}
+
+        for i, post in enumerate(self.posts):
+            self.ids[i] = post.get('id', 0) or 0
+            publish_date = post.get('publish_date')
+            if isinstance(publish_date, date):
+                self.date_ordinals[i] = publish_date.toordinal()
+            self.title_lengths[i] = len(post.get('title', ''))
+            self.content_lengths[i] = len(post.get('content', ''))
+            self.keyword_counts[i] = len(post.get('keywords', []))
+            language = post.get('language', 'unknown')
+            code = language_lookup.get(language)
+            if code is None:
+                code = language_lookup[language] = len(self.languages)
+                self.languages.append(language)
+            self.language_codes[i] = code
+            self.scores[i] = post.get('popularity_score', 0) or 0
+
+        self._rankings: Dict[Optional[str], array] = {}
+        self._sorted_content_lengths = None
+        self._positions = None
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def ranking(self, exclude_language: Optional[str] = None) -> array:
+        """按热度降序排列的下标（排序稳定，同分按原顺序），可排除某种语言"""
+        order = self._rankings.get(exclude_language)
+        if order is None:
+            order = self._rankings.get(None)
+            if order is None:
+                order = array('l', sorted(range(len(self.posts)), key=self.scores.__getitem__, reverse=True))
+                self._rankings[None] = order
+            if exclude_language is not None:
+                if exclude_language in self.languages:
+                    excluded = self.languages.index(exclude_language)
+                    codes = self.language_codes
+                    order = array('l', [i for i in order if codes[i] != excluded])
+                self._rankings[exclude_language] = order
+        return order
+
+    def positions(self) -> Dict[int, int]:
+        """文章 id -> 列下标"""
+        positions = self._positions
+        if positions is None:
+            positions = self._positions = {post_id: i for i, post_id in enumerate(self.ids)}
+        return positions
+
+    def boosted_ranking(self, order: array, bonuses: Dict[int, float]) -> array:
+        """在热度排名 order 上叠加按文章 id 给出的加分
+
+        只有加分文章需要重新定位：按新分数二分查找其在其余文章中的位置，
+        其余文章保持原顺序，因此代价为 O(n + k log n)，k 为加分文章数。
+        """
+        positions = self.positions()
+        scores = self.scores
+        boosted = {}
+        for post_id, bonus in bonuses.items():
+            i = positions.get(post_id)
+            if i is not None and bonus:
+                boosted[i] = scores[i] + bonus
+        if not boosted:
+            return order
+
+        rest = array('l')
+        moved = []
+        for i in order:
+            if i in boosted:
+                moved.append(i)
+            else:
+                rest.append(i)
+        if not moved:
+            return order
+
+        # rest 按 (-score, 下标) 升序排列，与 ranking() 的稳定排序一致
+        neg_scores = array('d', [-scores[i] for i in rest])
+        moved.sort(key=lambda i: (-boosted[i], i))
+        result = array('l')
+        prev = 0
+        for i in moved:
+            key = -boosted[i]
+            pos = bisect_left(neg_scores, key, prev)
+            while pos < len(rest) and neg_scores[pos] == key and rest[pos] < i:
+                pos += 1
+            result.extend(rest[prev:pos])
+            result.append(i)
+            prev = pos
+        result.extend(rest[prev:])
+        return result
+
+    def language_distribution(self) -> Dict[str, int]:
+        return {self.languages[code]: count for code, count in Counter(self.language_codes).items()}
+
+    def length_distribution(self) -> Dict[str, int]:
+        """内容长度分档计数：在排好序的长度列上二分查找各档边界"""
+        lengths = self._sorted_content_lengths
+        if lengths is None:
+            lengths = self._sorted_content_lengths = array('l', sorted(self.content_lengths))
+        distribution = {}
+        for name, low, high in LENGTH_BUCKETS:
+            lo = bisect_left(lengths, low)
+            hi = len(lengths) if high is None else bisect_left(lengths, high)
+            distribution[name] = hi - lo
+        return distribution
@@ -0,0 +1,173 @@
+import hashlib
+import heapq
+import html
+import json
+import os
+import re
+import time
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# 按文章年龄给出的基础复查间隔：新文章更可能被修改
+AGE_INTERVALS = (
+    (7, 1 * DAY),
+    (30, 3 * DAY),
+    (365, 14 * DAY),
+)
+OLD_POST_INTERVAL = 60 * DAY
+
+
+def content_fingerprint(title: str, content: str) -> str:
+    """内容指纹：去掉 HTML 标签和空白后的标题+正文哈希
+
+    早期数据的 content 保存的是 HTML，新解析的是纯文本，归一化后两者可比较。
+    """
+    text = html.unescape(re.sub(r'<[^>]+>', '', content or ''))
+    normalized = re.sub(r'\s+', '', f"{title or ''}\0{text}")
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class RecrawlScheduler:
+    """文章复查调度器
+
+    每个URL的复查间隔 = 按年龄的基础间隔 × 学习到的倍数：检测到修改时倍数减半，
+    未修改时乘以 1.5。到期队列用最小堆维护，取出到期URL的代价为 O(k log n)。
+    取出的URL会先被租约推迟 lease 秒，若本轮未回报结果（例如进程崩溃），租约到期后会再次出队。
+    """
+
+    def __init__(self, state_file: str = 'recrawl_state.json', min_interval: float = 6 * HOUR,
+                 max_interval: float = 90 * DAY, lease: float = HOUR):
+        self.state_file = state_file
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lease = lease
+        self.entries: Dict[str, Dict] = {}
+        self._heap: List[tuple] = []
+        self.load()
+
+    def load(self):
+        """加载调度状态"""
+        self.entries = {}
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('urls', {})
+            except Exception as e:
+                print(f"加载复查状态失败: {e}")
+                self.entries = {}
+        self._heap = [(entry['next_due'], url) for url, entry in self.entries.items()]
+        heapq.heapify(self._heap)
+
+    def save(self):
+        """保存调度状态（先写临时文件再替换）"""
+        try:
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'urls': self.entries, 'last_update': datetime.now().isoformat()},
+                          f, ensure_ascii=False)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            print(f"保存复查状态失败: {e}")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def base_interval(self, publish_date: Optional[str], now: float) -> float:
+        """按文章年龄给出的基础间隔，发布日期未知时按旧文章处理"""
+        if not publish_date:
+            return OLD_POST_INTERVAL
+        try:
+            published = date.fromisoformat(str(publish_date)[:10])
+        except ValueError:
+            return OLD_POST_INTERVAL
+        age_days = (date.fromtimestamp(now) - published).days
+        for max_age, interval in AGE_INTERVALS:
+            if age_days <= max_age:
+                return interval
+        return OLD_POST_INTERVAL
+
+    def _interval(self, entry: Dict, now: float) -> float:
+        interval = self.base_interval(entry.get('publish_date'), now) * entry['multiplier']
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _schedule(self, url: str, next_due: float):
+        self.entries[url]['next_due'] = next_due
+        heapq.heappush(self._heap, (next_due, url))
+
+    def track(self, url: str, publish_date=None, last_seen: Optional[float] = None,
+              fingerprint: Optional[str] = None, now: Optional[float] = None) -> bool:
+        """登记URL（已登记的忽略），首次复查时间为上次抓取时间 + 间隔"""
+        if not url or url in self.entries:
+            return False
+        now = time.time() if now is None else now
+        entry = {
+            'publish_date': publish_date.isoformat() if isinstance(publish_date, date) else publish_date,
+            'multiplier': 1.0,
+            'checks': 0,
+            'changes': 0,
+            'last_checked': None,
+            'fingerprint': fingerprint,
+        }
+        self.entries[url] = entry
+        self._schedule(url, (last_seen if last_seen is not None else now) + self._interval(entry, now))
+        return True
+
+    def track_posts(self, posts: Iterable, now: Optional[float] = None) -> int:
+        """批量登记数据管理器中的文章"""
+        added = 0
+        for post in posts:
+            last_seen = post.get('updated_at') or post.get('crawl_time') or post.get('created_at')
+            try:
+                last_seen = datetime.fromisoformat(last_seen).timestamp() if last_seen else None
+            except ValueError:
+                last_seen = None
+            if self.track(post.get('url'), post.get('publish_date'), last_seen,
+                          content_fingerprint(post.get('title', ''), post.get('content', '')), now):
+                added += 1
+        return added
+
+    def due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[str]:
+        """取出到期的URL（最早到期的优先），并为其加上租约"""
+        now = time.time() if now is None else now
+        urls = []
+        while self._heap and self._heap[0][0] <= now and (limit is None or len(urls) < limit):
+            next_due, url = heapq.heappop(self._heap)
+            entry = self.entries.get(url)
+            # 堆中可能有被重新调度的过期条目，跳过
+            if entry is None or entry['next_due'] != next_due:
+                continue
+            urls.append(url)
+        for url in urls:
+            self._schedule(url, now + self.lease)
+        return urls
+
+    def record(self, url: str, fingerprint: Optional[str], now: Optional[float] = None) -> bool:
+        """回报一次复查结果，返回内容是否发生变化；fingerprint 为 None 表示抓取失败"""
+        entry = self.entries.get(url)
+        if entry is None:
+            return False
+        now = time.time() if now is None else now
+        if fingerprint is None:
+            # 抓取失败：不调整倍数，按当前间隔重试
+            self._schedule(url, now + self._interval(entry, now))
+            return False
+
+        changed = entry.get('fingerprint') is not None and fingerprint != entry['fingerprint']
+        entry['checks'] += 1
+        entry['last_checked'] = now
+        entry['fingerprint'] = fingerprint
+        if changed:
+            entry['changes'] += 1
+            entry['multiplier'] = max(1 / 16, entry['multiplier'] * 0.5)
+        else:
+            entry['multiplier'] = min(16.0, entry['multiplier'] * 1.5)
+        self._schedule(url, now + self._interval(entry, now))
+        return changed
+
+    def compact(self):
+        """重建堆，清除被重新调度留下的过期条目"""
+        self._heap = [(entry['next_due'], url) for url, entry in self.entries.items()]
+        heapq.heapify(self._heap)
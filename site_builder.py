@@ -0,0 +1,182 @@
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(ROOT, 'templates')
+MANIFEST_FILE = '.build_manifest.json'
+# 渲染逻辑变化时递增，强制全量重建
+BUILD_VERSION = 1
+PER_PAGE = 12
+
+
+def _template_fingerprint() -> str:
+    """所有模板内容的哈希：任一模板（含 base.html）变化都会使全部页面重建"""
+    digest = hashlib.sha256(str(BUILD_VERSION).encode())
+    for name in sorted(os.listdir(TEMPLATE_DIR)):
+        with open(os.path.join(TEMPLATE_DIR, name), 'rb') as f:
+            digest.update(name.encode())
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _content_hash(fingerprint: str, kind: str, template: Optional[str], context: Dict) -> str:
+    payload = json.dumps(context, ensure_ascii=False, sort_keys=True, default=_json_default)
+    return hashlib.sha256(f"{fingerprint}\0{kind}\0{template}\0{payload}".encode('utf-8')).hexdigest()
+
+
+def _json_default(o):
+    if hasattr(o, 'to_dict'):
+        return o.to_dict()
+    return str(o)
+
+
+def collect_pages(manager) -> List[Tuple[str, str, str, Optional[str], Dict]]:
+    """列出需要生成的页面：(输出相对路径, 请求路径, 类型, 模板, 上下文)"""
+    pages = []
+
+    first_page = manager.get_filtered_posts(filter_english=True, page=1, per_page=PER_PAGE)
+    pages.append(('index.html', '/', 'html', 'index.html', {'posts': first_page, 'static_site': True}))
+    for page in range(1, first_page['pages'] + 1):
+        result = first_page if page == 1 else manager.get_filtered_posts(
+            filter_english=True, page=page, per_page=PER_PAGE)
+        pages.append((f'api/posts/page/{page}.json', f'/api/posts?page={page}', 'json', None,
+                      {'success': True, 'data': result}))
+
+    for post in manager.posts:
+        post_id = post.get('id')
+        pages.append((f'post/{post_id}/index.html', f'/post/{post_id}', 'html', 'post_detail.html', {'post': post}))
+
+    pages.extend(collect_archive_pages(manager))
+
+    pages.append(('stats/index.html', '/stats', 'html', 'stats.html', {'stats': manager.get_stats()}))
+    pages.append(('api/stats.json', '/api/stats', 'json', None, {'success': True, 'data': manager.get_stats()}))
+    pages.append(('api/stats/language.json', '/api/stats/language', 'json', None,
+                  {'success': True, 'data': manager.get_language_distribution()}))
+    pages.append(('api/stats/trend.json', '/api/stats/trend', 'json', None,
+                  {'success': True, 'data': manager.get_monthly_trend(12)}))
+    pages.append(('api/stats/content.json', '/api/stats/content', 'json', None,
+                  {'success': True, 'data': manager.get_content_analysis()}))
+    return pages
+
+
+def collect_archive_pages(manager) -> List[Tuple[str, str, str, Optional[str], Dict]]:
+    """归档页：全部文章、每年、每月各一组分页，以及对应的 JSON
+
+    静态服务器无法按查询参数区分页面，第 2 页起使用路径形式 archive/<年>/<月>/page/<n>
+    （模板中的 archive_url 在静态站点里生成同样的链接）。
+    """
+    pages = []
+    date_groups = manager.get_date_groups()
+    scopes = [(None, None)]
+    scopes.extend((year, None) for year in sorted({group['year'] for group in date_groups}, reverse=True))
+    scopes.extend((group['year'], group['month']) for group in date_groups)
+    pages.append(('api/archive/groups.json', '/api/archive/groups', 'json', None,
+                  {'success': True, 'data': date_groups}))
+
+    for year, month in scopes:
+        prefix = '/'.join(['archive'] + [str(part) for part in (year, month) if part is not None])
+        page = pages_total = 1
+        while page <= pages_total:
+            result = manager.get_posts_by_date(year, month, page=page, per_page=PER_PAGE)
+            pages_total = result['pages']
+            html_dir = prefix if page == 1 else f'{prefix}/page/{page}'
+            pages.append((f'{html_dir}/index.html', f'/{prefix}', 'html', 'archive.html',
+                          {'posts': result, 'date_groups': date_groups, 'year': year, 'month': month,
+                           'static_site': True}))
+            pages.append((f'api/{prefix}/page/{page}.json', f'/api/{prefix}?page={page}', 'json', None,
+                          {'success': True, 'data': result}))
+            page += 1
+    return pages
+
+
+def _write(path: str, body: bytes):
+    """写入文件及预压缩的 .gz 副本（先写临时文件再替换）"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for target, data in ((path, body), (path + '.gz', gzip.compress(body, compresslevel=9, mtime=0))):
+        tmp = target + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, target)
+
+
+def _render_batch(output_dir: str, batch: List[Tuple[str, str, str, Optional[str], Dict]]) -> int:
+    """在工作进程中渲染一批页面"""
+    from flask import render_template
+    from app import app
+
+    for rel_path, url_path, kind, template, context in batch:
+        with app.test_request_context(url_path):
+            if kind == 'html':
+                body = render_template(template, **context)
+            else:
+                body = app.json.dumps(context)
+        _write(os.path.join(output_dir, rel_path), body.encode('utf-8'))
+    return len(batch)
+
+
+def build_site(manager, output_dir: str = 'static_site', workers: Optional[int] = None,
+               force: bool = False, batch_size: int = 200) -> Dict[str, int]:
+    """生成静态站点，只重新渲染输入内容哈希发生变化的页面"""
+    output_dir = os.path.abspath(output_dir)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = {}
+    if not force and os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            print(f"读取构建清单失败，将全量构建: {e}")
+
+    fingerprint = _template_fingerprint()
+    pages = collect_pages(manager)
+    new_manifest = {}
+    dirty = []
+    for page in pages:
+        rel_path, _, kind, template, context = page
+        digest = _content_hash(fingerprint, kind, template, context)
+        new_manifest[rel_path] = digest
+        if manifest.get(rel_path) != digest or not os.path.exists(os.path.join(output_dir, rel_path)):
+            dirty.append(page)
+
+    rendered = 0
+    if dirty:
+        batches = [dirty[i:i + batch_size] for i in range(0, len(dirty), batch_size)]
+        if workers == 1 or len(batches) == 1:
+            rendered = sum(_render_batch(output_dir, batch) for batch in batches)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rendered = sum(executor.map(_render_batch, [output_dir] * len(batches), batches))
+
+    # 删除已不存在的页面（例如文章减少后多出的分页）
+    removed = 0
+    for rel_path in set(manifest) - set(new_manifest):
+        for target in (rel_path, rel_path + '.gz'):
+            path = os.path.join(output_dir, target)
+            if os.path.exists(path):
+                os.remove(path)
+        removed += 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(new_manifest, f, indent=0, sort_keys=True)
+
+    return {'total': len(pages), 'rendered': rendered, 'skipped': len(pages) - rendered, 'removed': removed}
+
+
+if __name__ == '__main__':
+    import argparse
+    from data_manager import data_manager
+
+    parser = argparse.ArgumentParser(description='生成静态站点')
+    parser.add_argument('--output', default='static_site')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='忽略构建清单，全量重建')
+    args = parser.parse_args()
+
+    result = build_site(data_manager, args.output, args.workers, args.force)
+    print(f"共 {result['total']} 个页面，渲染 {result['rendered']} 个，跳过 {result['skipped']} 个，"
+          f"删除 {result['removed']} 个")
@@ -0,0 +1,188 @@
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 前缀区间的上界哨兵：大于任何合法字符
+_PREFIX_END = '\U0010ffff'
+
+
+def normalize_term(text: str) -> str:
+    """归一化词条：小写、合并空白"""
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+def normalize_prefix(text: str) -> str:
+    """归一化查询前缀：与词条一致，但保留末尾空格（用户正在输入下一个单词）"""
+    return re.sub(r'\s+', ' ', text or '').lstrip().lower()
+
+
+class Suggestion:
+    """补全候选项"""
+    __slots__ = ('term', 'text', 'kind', 'post_id', 'weight')
+
+    def __init__(self, term: str, text: str, kind: str, post_id: Optional[int], weight: float):
+        self.term = term
+        self.text = text
+        self.kind = kind
+        self.post_id = post_id
+        self.weight = weight
+
+    def to_dict(self) -> Dict:
+        return {
+            'text': self.text,
+            'type': self.kind,
+            'post_id': self.post_id,
+            'score': round(self.weight, 2)
+        }
+
+
+def _weight_of(item: Suggestion) -> float:
+    return item.weight
+
+
+class SuggestIndex:
+    """搜索补全索引
+
+    词条按升序存放在有序数组中，前缀查询通过二分查找定位 [lo, hi) 区间。
+    候选数超过 cache_threshold 的短前缀会预先计算 top-k，
+    因此任意查询的代价为 O(log n + cache_threshold)。
+    同一词条重复加入时权重累加（关键词的权重即包含它的文章热度之和）。
+    已发布的 Suggestion 对象不会被修改，配合 copy() 可实现写时复制。
+    """
+
+    def __init__(self, top_k: int = 10, cache_threshold: int = 128, max_cached_prefix: int = 6):
+        self.top_k = top_k
+        self.cache_threshold = cache_threshold
+        self.max_cached_prefix = max_cached_prefix
+        self.terms: List[str] = []
+        self.items: List[Suggestion] = []
+        self._by_key: Dict[Tuple[str, str], Suggestion] = {}
+        self._top: Dict[str, List[Suggestion]] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def build(self, entries: Iterable[Tuple[str, str, Optional[int], float]]):
+        """全量构建索引，entries 为 (text, kind, post_id, weight)"""
+        merged: Dict[Tuple[str, str], list] = {}
+        for text, kind, post_id, weight in entries:
+            term = normalize_term(text)
+            if not term:
+                continue
+            entry = merged.get((term, kind))
+            if entry is None:
+                merged[(term, kind)] = [text.strip(), post_id, weight]
+            else:
+                entry[2] += weight
+
+        self._by_key = {
+            (term, kind): Suggestion(term, text, kind, post_id, weight)
+            for (term, kind), (text, post_id, weight) in merged.items()
+        }
+        ordered = sorted(self._by_key.values(), key=lambda item: item.term)
+        self.terms = [item.term for item in ordered]
+        self.items = ordered
+        self._top = {}
+
+        # 预计算热门前缀的 top-k（同一前缀的词条在数组中连续）
+        for length in range(1, self.max_cached_prefix + 1):
+            for prefix, group in groupby(range(len(self.terms)), key=lambda i: self.terms[i][:length]):
+                if len(prefix) < length:
+                    continue
+                group = list(group)
+                if len(group) > self.cache_threshold:
+                    self._top[prefix] = heapq.nlargest(
+                        self.top_k, (self.items[i] for i in group), key=_weight_of)
+
+    def copy(self) -> 'SuggestIndex':
+        """复制索引结构（词条对象共享），修改副本不影响原索引的读者"""
+        clone = SuggestIndex(self.top_k, self.cache_threshold, self.max_cached_prefix)
+        clone.terms = list(self.terms)
+        clone.items = list(self.items)
+        clone._by_key = dict(self._by_key)
+        clone._top = {prefix: list(top) for prefix, top in self._top.items()}
+        return clone
+
+    def add(self, entries: Iterable[Tuple[str, str, Optional[int], float]]) -> int:
+        """增量加入词条，返回新增词条数"""
+        added = 0
+        for text, kind, post_id, weight in entries:
+            term = normalize_term(text)
+            if not term:
+                continue
+            existing = (term, kind) in self._by_key
+            item = self._merge(text, kind, post_id, weight)
+            if not existing:
+                pos = bisect_right(self.terms, term)
+                self.terms.insert(pos, term)
+                self.items.insert(pos, item)
+                added += 1
+            self._refresh_prefixes(item)
+        return added
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """返回按权重排序的前缀补全结果"""
+        prefix = normalize_prefix(prefix)
+        if not prefix:
+            return []
+        limit = max(1, min(limit, self.top_k))
+
+        lo, hi = self._range(prefix)
+        if hi - lo > self.cache_threshold and prefix in self._top:
+            candidates = self._top[prefix][:limit]
+        else:
+            candidates = heapq.nlargest(limit, self.items[lo:hi], key=_weight_of)
+        return [item.to_dict() for item in candidates]
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.terms, prefix)
+        hi = bisect_left(self.terms, prefix + _PREFIX_END, lo)
+        return lo, hi
+
+    def _merge(self, text: str, kind: str, post_id: Optional[int], weight: float) -> Optional[Suggestion]:
+        term = normalize_term(text)
+        if not term:
+            return None
+        key = (term, kind)
+        item = self._by_key.get(key)
+        if item is None:
+            item = Suggestion(term, text.strip(), kind, post_id, weight)
+            self._by_key[key] = item
+        else:
+            # 不就地修改（旧对象可能仍被其他副本引用），以新对象替换
+            updated = Suggestion(term, item.text, kind, item.post_id, item.weight + weight)
+            self._by_key[key] = updated
+            self._replace(item, updated)
+            item = updated
+        return item
+
+    def _replace(self, old: Suggestion, new: Suggestion):
+        pos = bisect_left(self.terms, old.term)
+        while pos < len(self.terms) and self.terms[pos] == old.term:
+            if self.items[pos] is old:
+                self.items[pos] = new
+                break
+            pos += 1
+        for length in range(1, min(len(old.term), self.max_cached_prefix) + 1):
+            top = self._top.get(old.term[:length])
+            if top is not None and old in top:
+                top[top.index(old)] = new
+
+    def _refresh_prefixes(self, item: Suggestion):
+        """词条新增或权重上升后，更新受影响前缀的 top-k"""
+        for length in range(1, min(len(item.term), self.max_cached_prefix) + 1):
+            prefix = item.term[:length]
+            top = self._top.get(prefix)
+            if top is None:
+                lo, hi = self._range(prefix)
+                if hi - lo > self.cache_threshold:
+                    self._top[prefix] = heapq.nlargest(self.top_k, self.items[lo:hi], key=_weight_of)
+                continue
+            if item not in top:
+                if len(top) >= self.top_k and item.weight <= top[-1].weight:
+                    continue
+                top.append(item)
+            top.sort(key=_weight_of, reverse=True)
+            del top[self.top_k:]
@@ -0,0 +1,117 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# 浏览分数并入热度排序时的权重：加分 = VIEW_WEIGHT * ln(1 + 衰减后的浏览数)
+VIEW_WEIGHT = 2.0
+
+
+class ViewCounter:
+    """文章浏览计数与时间衰减分数
+
+    计数分散在进程内固定数量的分片中，每个分片一个字典和一把锁，线程按线程号选择分片。
+    Web 服务器常为每个请求新建线程，分片与线程无关，因此新线程没有登记开销，
+    结束的线程也不会留下需要清理的状态；不同线程大多落在不同分片，锁基本无竞争。
+    后台线程每 flush_interval 秒把各分片的字典整体换出作为增量，并入按指数衰减
+    （半衰期 half_life 秒）的浏览分数。分数字典每次汇总后整体替换，读者拿到的总是
+    某次汇总的完整结果。计数只在本进程内有效，重启后清零。
+    """
+
+    def __init__(self, half_life: float = 24 * 3600, flush_interval: float = 5.0,
+                 min_score: float = 0.01, refresh_interval: float = 300, stripes: int = 17):
+        self.half_life = half_life
+        self.flush_interval = flush_interval
+        self.min_score = min_score
+        # 没有新浏览时，每隔 refresh_interval 秒仍发布一次衰减后的分数
+        self.refresh_interval = refresh_interval
+        self.total_views = 0
+        self.version = 0
+        # 分片：[锁, 文章 id -> 上次汇总以来的浏览数]。线程号是按栈对齐的地址，
+        # 分片数取质数，取模后仍能均匀分布
+        self._stripes: List[list] = [[threading.Lock(), {}] for _ in range(stripes)]
+        self._scores: Dict[int, float] = {}
+        self._scored_at = time.time()
+        self._published_at = self._scored_at
+        self._boosts: Tuple[int, Dict[int, float]] = (0, {})
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def record(self, post_id: int):
+        """记录一次浏览"""
+        stripes = self._stripes
+        stripe = stripes[threading.get_ident() % len(stripes)]
+        with stripe[0]:
+            counts = stripe[1]
+            counts[post_id] = counts.get(post_id, 0) + 1
+        if self._flusher is None and self.flush_interval:
+            self._start_flusher()
+
+    def _start_flusher(self):
+        with self._start_lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name='view-counter', daemon=True)
+                self._flusher.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        """停止后台汇总线程并做最后一次汇总"""
+        self._stop_event.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """汇总各线程的新增浏览并更新衰减分数，返回本次汇总的浏览数"""
+        with self._flush_lock:
+            now = time.time() if now is None else now
+            deltas: Dict[int, int] = {}
+            for stripe in self._stripes:
+                # 持锁期间只换出字典，合并在锁外进行
+                with stripe[0]:
+                    counts = stripe[1]
+                    stripe[1] = {}
+                for post_id, delta in counts.items():
+                    deltas[post_id] = deltas.get(post_id, 0) + delta
+
+            factor = 0.5 ** (max(0.0, now - self._scored_at) / self.half_life)
+            scores = {}
+            for post_id, score in self._scores.items():
+                score *= factor
+                if score >= self.min_score:
+                    scores[post_id] = score
+            for post_id, delta in deltas.items():
+                scores[post_id] = scores.get(post_id, 0.0) + delta
+            self._scores = scores
+            self._scored_at = now
+
+            added = sum(deltas.values())
+            self.total_views += added
+            if added or (scores and now - self._published_at >= self.refresh_interval):
+                self.version += 1
+                self._published_at = now
+                self._boosts = (self.version, {
+                    post_id: VIEW_WEIGHT * math.log1p(score) for post_id, score in scores.items()
+                })
+            return added
+
+    def scores(self) -> Dict[int, float]:
+        """上次汇总时的衰减浏览分数"""
+        return self._scores
+
+    def boosts(self) -> Tuple[int, Dict[int, float]]:
+        """(版本号, 文章 id -> 热度加分)，版本号变化时排序需要重新计算"""
+        return self._boosts
+
+    def stats(self) -> Dict:
+        return {
+            'total_views': self.total_views,
+            'tracked_posts': len(self._scores),
+            'stripes': len(self._stripes),
+            'version': self.version,
+        }